@@ -0,0 +1,250 @@
+"""Response cache for read-heavy endpoints.
+
+Entries are stored per resource (``company:12``) or per list namespace
+(``companies``). Namespaces carry a generation counter that mutations bump,
+which drops every cached page of a list at once without scanning keys.
+
+Namespaced entries are also keyed by the caller's company scope, so
+supervisors never share pages with admins or with each other. Per-resource
+entries are only cached for unscoped callers: they are invalidated by
+deleting one key, which cannot reach per-company copies.
+
+Endpoints using the cache read from the primary, never the replica; see
+:func:`app.core.database.get_read_session_factory`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.metrics import cache_requests
+from app.core.tenancy import current_company_id
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump(self, namespace: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry.
+
+    Each gunicorn worker holds its own copy, so a mutation only invalidates
+    the worker that served it; other workers catch up when entries expire.
+    Use the Redis backend when that window matters.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # Kept apart from the entries so LRU eviction never resets a
+        # generation and resurrects stale pages.
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def bump(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Backend for any client with the ``redis.asyncio`` interface."""
+
+    def __init__(self, client: Any, prefix: str = "controldoc:cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def generation(self, namespace: str) -> int:
+        value = await self.client.get(f"{self.prefix}gen:{namespace}")
+        return int(value) if value is not None else 0
+
+    async def bump(self, namespace: str) -> None:
+        await self.client.incr(f"{self.prefix}gen:{namespace}")
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+@lru_cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _encode(headers: dict[str, str], body: bytes) -> bytes:
+    return json.dumps(headers).encode() + b"\n" + body
+
+
+def _decode(value: bytes) -> tuple[dict[str, str], bytes]:
+    headers, _, body = value.partition(b"\n")
+    return json.loads(headers), body
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    async def _key(self, key: str, namespace: str | None, company_id: int | None) -> str:
+        if namespace is None:
+            return key
+        scope = "all" if company_id is None else f"c{company_id}"
+        return f"{namespace}:v{await self.backend.generation(namespace)}:{scope}:{key}"
+
+    async def response(
+        self,
+        request: Request,
+        key: str,
+        build: Callable[[Response], Awaitable[Any]],
+        response_type: Any,
+        *,
+        namespace: str | None = None,
+        ttl: float | None = None,
+    ) -> Response:
+        """Serve ``key`` from the cache, or build, serialize and store it.
+
+        ``build`` receives a scratch response whose headers (such as the
+        pagination cursor) are cached along with the body. Exceptions from
+        ``build`` propagate and nothing is stored.
+        """
+
+        company_id = current_company_id()
+        cacheable = namespace is not None or company_id is None
+        cache_key = await self._key(key, namespace, company_id)
+        cached = await self.backend.get(cache_key) if cacheable else None
+        if cached is not None:
+            headers, body = _decode(cached)
+            outcome = "HIT"
+        else:
+            scratch = Response()
+            data = await build(scratch)
+            adapter = _adapter(response_type)
+            body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+            headers = {name: value for name, value in scratch.headers.items() if name.startswith("x-")}
+            headers["etag"] = _etag(body)
+            if cacheable:
+                await self.backend.set(cache_key, _encode(headers, body), self.ttl if ttl is None else ttl)
+            outcome = "MISS" if cacheable else "BYPASS"
+        cache_requests.inc(outcome=outcome.lower())
+
+        headers = {**headers, "cache-control": "no-cache", "x-cache": outcome}
+        if _etag_matches(request.headers.get("if-none-match"), headers["etag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, keys: Iterable[str] = (), namespaces: Iterable[str] = ()) -> None:
+        await self.backend.delete(*keys)
+        for namespace in namespaces:
+            await self.backend.bump(namespace)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def list_key(request: Request) -> str:
+    """Cache key for a list page: its sorted query parameters."""
+
+    return "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+
+
+def _build_backend() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        import redis.asyncio as redis
+
+        return RedisBackend(redis.from_url(settings.redis_url))
+    return MemoryBackend(settings.cache_max_entries)
+
+
+@lru_cache
+def get_cache() -> ResponseCache:
+    return ResponseCache(_build_backend(), settings.cache_ttl_seconds)
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "ResponseCache",
+    "get_cache",
+    "list_key",
+]
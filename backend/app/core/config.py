@@ -4,24 +4,82 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_name: str = "ControlDoc API"
     database_url: str = "postgresql+asyncpg://postgres:postgres@db:5432/controldoc"
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: bool = True
+    db_statement_timeout_ms: int = 30000
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
+    database_replica_url: str | None = None
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval_seconds: float = 5.0
     jwt_secret_key: str = "CHANGE_ME"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    auth_token_cache_size: int = 10_000
     admin_email: str = "lbadilla1970@gmail.com"
     admin_password: str = "CerroColorado.2020"
     admin_full_name: str = "Administrador"
+    password_scrypt_n: int = 2**14
+    password_scrypt_r: int = 8
+    password_scrypt_p: int = 1
+    password_hash_workers: int = 2
+    login_rate_limit_attempts: int = 10
+    login_rate_limit_window_seconds: float = 60.0
     allowed_origins: list[str] = ["http://localhost:3000", "http://localhost:8000"]
     minio_endpoint: str = "minio:9000"
     minio_access_key: str = "minio"
     minio_secret_key: str = "minio123"
     minio_bucket: str = "controldoc"
     minio_secure: bool = False
+    minio_region: str = "us-east-1"
+    minio_public_endpoint: str | None = None
+    presigned_url_expire_seconds: int = 900
+    minio_part_size: int = 10 * 1024 * 1024
+    minio_max_pool_connections: int = 16
+    minio_connect_timeout: float = 5.0
+    minio_read_timeout: float = 120.0
+    storage_backend: str = "minio"
+    local_storage_path: str = "./storage"
+    max_upload_size_bytes: int = 100 * 1024 * 1024
+    bulk_upload_concurrency: int = 8
+    bulk_upload_max_files: int = 500
     smtp_host: str = "localhost"
     smtp_port: int = 1025
     smtp_username: str | None = None
     smtp_password: str | None = None
     smtp_from: str = "noreply@example.com"
     smtp_use_tls: bool = False
+    smtp_pool_size: int = 4
+    smtp_timeout: float = 30.0
+    smtp_max_idle_seconds: float = 60.0
+    alert_reminder_days: list[int] = [30, 15, 7, 1, 0]
+    alert_digest_enabled: bool = False
+    alert_company_contacts_enabled: bool = False
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 5
+    outbox_backoff_seconds: float = 60.0
+    outbox_max_backoff_seconds: float = 3600.0
+    outbox_lease_seconds: float = 300.0
+    outbox_poll_interval_seconds: float = 5.0
+    cache_backend: str = "memory"
+    cache_ttl_seconds: float = 60.0
+    cache_max_entries: int = 1024
+    redis_url: str = "redis://redis:6379/0"
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = False
+    scheduler_enabled: bool = False
+    scheduler_lock_key: int = 7_311_001
+    verify_expirations_lock_key: int = 7_311_002
+    scheduler_warning_days: int = 30
+    scheduler_verify_interval_seconds: float = 3600.0
+    scheduler_alert_interval_seconds: float = 3600.0
+    scheduler_purge_interval_seconds: float = 3600.0
+    scheduler_stats_interval_seconds: float = 3600.0
+    storage_purge_grace_seconds: float = 3600.0
 
     class Config:
         env_file = ".env"
@@ -1,13 +1,193 @@
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, future=True, echo=False)
+logger = logging.getLogger(__name__)
+
+
+def _asyncpg_connect_args() -> dict[str, Any]:
+    if settings.db_pgbouncer:
+        # PgBouncer in transaction mode hands each transaction to any server
+        # connection, so named prepared statements cannot be cached, and
+        # startup parameters may be rejected. Set statement_timeout on the
+        # database role instead.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    server_settings = {"application_name": settings.app_name}
+    if settings.db_statement_timeout_ms:
+        server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+    return {
+        "server_settings": server_settings,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """Pool and driver options for ``database_url`` taken from settings."""
+
+    url = make_url(database_url)
+    # SQLite (tests, local tooling) uses a single-connection pool that takes
+    # none of the sizing options.
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = _asyncpg_connect_args()
+    return options
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int) -> None:
+    """Open ``size`` connections up front so the first requests do not.
+
+    Run from the lifespan, this completes before the worker accepts
+    requests, moving connection setup out of the request path at deploy.
+    """
+
+    if size <= 0 or engine.dialect.name == "sqlite":
+        return
+
+    async def open_connection():
+        connection = await engine.connect()
+        await connection.execute(text("SELECT 1"))
+        return connection
+
+    connections = await asyncio.gather(
+        *(open_connection() for _ in range(size)), return_exceptions=True
+    )
+    opened = [connection for connection in connections if not isinstance(connection, BaseException)]
+    for connection in opened:
+        await connection.close()
+    if len(opened) < size:
+        failure = next(error for error in connections if isinstance(error, BaseException))
+        logger.warning("Opened %s of %s pool connections", len(opened), size, exc_info=failure)
+
+
+# Zero when the server is not a standby or has replayed everything it has
+# received; otherwise seconds since the last replayed transaction.
+_REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaLagGuard:
+    """Decides whether the replica is fresh enough to serve reads.
+
+    The lag is measured at most once per ``check_interval`` seconds and
+    shared by all requests in the process. A replica that lags more than
+    ``max_lag`` seconds, or cannot be queried, sends reads to the primary.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, check_interval: float) -> None:
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: float | None = None
+        self._healthy = False
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def _measure(self) -> float:
+        async with self.engine.connect() as connection:
+            return float(await connection.scalar(_REPLICA_LAG_QUERY))
+
+    async def healthy(self) -> bool:
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._healthy
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._healthy
+            try:
+                self.lag = await self._measure()
+            except Exception:
+                logger.warning("Replica lag check failed; reading from primary", exc_info=True)
+                self.lag = None
+            healthy = self.lag is not None and self.lag <= self.max_lag
+            if healthy != self._healthy:
+                logger.info("Replica %s (lag: %s)", "in use" if healthy else "bypassed", self.lag)
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+            return healthy
+
+
+engine = create_async_engine(
+    settings.database_url, future=True, echo=False, **engine_options(settings.database_url)
+)
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
 
+replica_engine: AsyncEngine | None = None
+ReplicaSessionLocal: async_sessionmaker[AsyncSession] | None = None
+replica_guard: ReplicaLagGuard | None = None
+if settings.database_replica_url:
+    replica_engine = create_async_engine(
+        settings.database_replica_url, echo=False, **engine_options(settings.database_replica_url)
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine, expire_on_commit=False, autoflush=False
+    )
+    replica_guard = ReplicaLagGuard(
+        replica_engine,
+        max_lag=settings.replica_max_lag_seconds,
+        check_interval=settings.replica_lag_check_interval_seconds,
+    )
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for read-only work: the replica when it is fresh enough.
+
+    Anything that writes, or must see a write it just made, uses
+    :func:`get_session` instead. So do endpoints served through the response
+    cache: a fill from a lagging replica would store pre-write data under
+    the generation the write just bumped, outliving the lag by the TTL.
+    """
+
+    if ReplicaSessionLocal is not None and await replica_guard.healthy():
+        return ReplicaSessionLocal
+    return SessionLocal
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    session_factory = await get_read_session_factory()
+    async with session_factory() as session:
+        yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the session factory for handlers that outlive the request scope.
+
+    Streaming responses are consumed after dependencies with ``yield`` have
+    been closed, so they open their own session from this factory.
+    """
+
+    return SessionLocal
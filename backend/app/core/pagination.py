@@ -0,0 +1,48 @@
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Query, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Keyset pagination parameters shared by the list endpoints.
+
+    ``cursor`` is the last ``id`` of the previous page; the id of the last row
+    of the current page is returned in the ``X-Next-Cursor`` header when more
+    rows are available.
+    """
+
+    def __init__(
+        self,
+        cursor: int | None = Query(None, ge=0, description="Return rows with an id greater than this"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ) -> None:
+        self.cursor = cursor
+        self.limit = limit
+
+
+async def paginate(
+    session: AsyncSession,
+    statement: Select,
+    id_column: Any,
+    page: PageParams,
+    response: Response,
+) -> Sequence[Any]:
+    statement = statement.order_by(id_column).limit(page.limit + 1)
+    if page.cursor is not None:
+        statement = statement.where(id_column > page.cursor)
+
+    rows = (await session.scalars(statement)).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return rows
+
+
+__all__ = ["DEFAULT_PAGE_SIZE", "MAX_PAGE_SIZE", "NEXT_CURSOR_HEADER", "PageParams", "paginate"]
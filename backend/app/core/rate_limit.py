@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+class RateLimiter:
+    """In-process token buckets, one per key.
+
+    Each key may spend ``attempts`` tokens in a burst, refilled evenly over
+    ``window`` seconds. Only the ``max_keys`` most recently used keys are
+    tracked, which bounds memory under a spray of distinct keys; an evicted
+    key simply starts again with a full bucket.
+    """
+
+    def __init__(self, attempts: int, window: float, max_keys: int = 10_000) -> None:
+        self.attempts = attempts
+        self.rate = attempts / window
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.attempts, now))
+        return min(self.attempts, tokens + (now - updated) * self.rate)
+
+    def hit(self, *keys: str) -> float:
+        """Spend one token from every key.
+
+        Returns 0 when allowed, otherwise the seconds until all keys have a
+        token again; nothing is spent on a rejected attempt.
+        """
+
+        now = time.monotonic()
+        tokens = {key: self._tokens(key, now) for key in keys}
+        missing = max((1 - value for value in tokens.values()), default=0)
+        if missing > 0:
+            return missing / self.rate
+
+        for key, value in tokens.items():
+            self._buckets[key] = (value - 1, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+    def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+
+@lru_cache
+def get_login_rate_limiter() -> RateLimiter:
+    return RateLimiter(settings.login_rate_limit_attempts, settings.login_rate_limit_window_seconds)
+
+
+__all__ = ["RateLimiter", "get_login_rate_limiter"]
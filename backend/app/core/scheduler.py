@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.metrics import scheduled_job_duration
+
+logger = logging.getLogger(__name__)
+
+JobCallable = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class LeaderLock:
+    """Session-level PostgreSQL advisory lock electing one scheduler leader.
+
+    The lock is held on a dedicated connection for as long as this process
+    is leader; if that connection drops, the server releases the lock and
+    another replica takes over on its next attempt. Other databases have no
+    advisory locks, so every process is leader there.
+    """
+
+    def __init__(self, engine: AsyncEngine, key: int) -> None:
+        self.engine = engine
+        self.key = key
+        self._connection: AsyncConnection | None = None
+        # Jobs run as separate tasks but share the leader connection.
+        self._lock = asyncio.Lock()
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    async def acquire(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return True
+        async with self._lock:
+            return await self._acquire()
+
+    async def _acquire(self) -> bool:
+        if self._connection is not None:
+            try:
+                await self._connection.execute(text("SELECT 1"))
+                await self._connection.commit()
+                return True
+            except DBAPIError:
+                logger.warning("Scheduler lost its leader connection")
+                await self._discard()
+
+        connection = await self.engine.connect()
+        try:
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            )
+            # The lock belongs to the session, so the transaction can end
+            # without leaving the connection idle in transaction.
+            await connection.commit()
+        except BaseException:
+            await connection.close()
+            raise
+
+        if not acquired:
+            await connection.close()
+            return False
+        self._connection = connection
+        logger.info("Scheduler acquired leadership")
+        return True
+
+    async def release(self) -> None:
+        async with self._lock:
+            if self._connection is None:
+                return
+            try:
+                await self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+                )
+                await self._connection.commit()
+            except DBAPIError:
+                pass
+            await self._discard()
+
+    async def _discard(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await connection.close()
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started_at: datetime | None = None
+    last_duration_seconds: float | None = None
+    max_duration_seconds: float = 0.0
+    total_duration_seconds: float = 0.0
+    last_error: str | None = None
+
+    @property
+    def average_duration_seconds(self) -> float | None:
+        return self.total_duration_seconds / self.runs if self.runs else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "average_duration_seconds": self.average_duration_seconds}
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    interval_seconds: float
+    func: JobCallable
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class Scheduler:
+    """Runs jobs on fixed intervals inside the event loop.
+
+    Jobs only run while this process holds the leader lock, so several
+    gunicorn workers or replicas may start a scheduler safely. Each job runs
+    in its own session and never overlaps with itself.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], leader: LeaderLock
+    ) -> None:
+        self.session_factory = session_factory
+        self.leader = leader
+        self.jobs: dict[str, ScheduledJob] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._stop = asyncio.Event()
+
+    def add_job(self, name: str, interval_seconds: float, func: JobCallable) -> ScheduledJob:
+        job = ScheduledJob(name=name, interval_seconds=interval_seconds, func=func)
+        self.jobs[name] = job
+        return job
+
+    async def run_job(self, job: ScheduledJob) -> bool:
+        """Run ``job`` once if this process is leader; return whether it ran."""
+
+        try:
+            is_leader = await self.leader.acquire()
+        except Exception:
+            logger.exception("Scheduler leader election failed")
+            is_leader = False
+        if not is_leader:
+            job.stats.skipped += 1
+            return False
+
+        stats = job.stats
+        stats.last_started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self.session_factory() as session:
+                result = await job.func(session)
+        except Exception as error:
+            stats.failures += 1
+            stats.last_error = repr(error)
+            logger.exception("Scheduled job %s failed", job.name)
+        else:
+            outcome = "ok"
+            stats.last_error = None
+            logger.info("Scheduled job %s finished: %s", job.name, result)
+        finally:
+            duration = time.perf_counter() - started
+            scheduled_job_duration.observe(duration, job=job.name, outcome=outcome)
+            stats.runs += 1
+            stats.last_duration_seconds = duration
+            stats.total_duration_seconds += duration
+            stats.max_duration_seconds = max(stats.max_duration_seconds, duration)
+        return True
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            await self.run_job(job)
+            delay = max(job.interval_seconds - (time.monotonic() - started), 0)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}")
+            for job in self.jobs.values()
+        ]
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    async def run_forever(self) -> None:
+        self.start()
+        try:
+            await self._stop.wait()
+        finally:
+            await self.stop()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop scheduling, giving running jobs ``timeout`` seconds to finish."""
+
+        self._stop.set()
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.leader.release()
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        return {name: job.stats.as_dict() for name, job in self.jobs.items()}
+
+
+__all__ = ["JobStats", "LeaderLock", "ScheduledJob", "Scheduler"]
@@ -1,9 +1,36 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
-from jose import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.tenancy import set_current_company_id
+
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+ROLE_ADMIN = "admin"
+ROLE_SUPERVISOR = "supervisor"
+
+_SCRYPT_PREFIX = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+
+class InvalidTokenError(ValueError):
+    pass
 
 
 def create_access_token(subject: str, additional_claims: dict[str, Any] | None = None) -> str:
@@ -17,5 +44,251 @@ def create_access_token(subject: str, additional_claims: dict[str, Any] | None =
     return encoded_jwt
 
 
-def verify_credentials(email: str, password: str) -> bool:
-    return email.lower() == settings.admin_email.lower() and password == settings.admin_password
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        # OpenSSL refuses anything above 32 MiB by default; scrypt needs
+        # 128 * n * r bytes, so leave headroom for tuned-up parameters.
+        maxmem=max(64 * 1024 * 1024, 256 * n * r * p),
+        dklen=_KEY_BYTES,
+    )
+
+
+def _current_parameters() -> tuple[int, int, int]:
+    return settings.password_scrypt_n, settings.password_scrypt_r, settings.password_scrypt_p
+
+
+def hash_password(password: str) -> str:
+    """Hash ``password`` as ``scrypt$n$r$p$salt$key`` with the configured cost."""
+
+    n, r, p = _current_parameters()
+    salt = os.urandom(_SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    encoded = (base64.b64encode(value).decode() for value in (salt, key))
+    return "$".join([_SCRYPT_PREFIX, str(n), str(r), str(p), *encoded])
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check ``password`` against a hash, using the cost stored with it.
+
+    Hashes keep their own parameters, so raising the configured cost does
+    not lock anyone out; see :func:`needs_rehash`.
+    """
+
+    try:
+        prefix, n, r, p, salt, key = password_hash.split("$")
+        if prefix != _SCRYPT_PREFIX:
+            return False
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    parameters = password_hash.split("$")[1:4]
+    return parameters != [str(value) for value in _current_parameters()]
+
+
+@lru_cache
+def _password_executor() -> ThreadPoolExecutor:
+    # Bounded separately from the default executor so a burst of logins
+    # cannot take every thread the rest of the app relies on.
+    return ThreadPoolExecutor(
+        max_workers=settings.password_hash_workers, thread_name_prefix="password"
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor(), hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor(), verify_password, password, password_hash
+    )
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class TokenVerifier:
+    """Verifies access tokens, remembering the claims of valid ones.
+
+    Verified claims are kept in an LRU keyed by the token's SHA-256 until the
+    token expires, so a client sending the same token on every request pays
+    for the signature check once. HMAC algorithms are checked directly with
+    :mod:`hmac`; anything else goes through ``jose``.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, max_entries: int = 10_000) -> None:
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        digest = _HMAC_DIGESTS.get(algorithm)
+        # Keyed once; copying the prepared state skips re-padding the key.
+        self._hmac = hmac.new(secret_key.encode(), digestmod=digest) if digest else None
+
+    def _verify_hmac(self, token: str) -> dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+        except ValueError as error:
+            raise InvalidTokenError("Malformed token") from error
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise InvalidTokenError("Unexpected signing algorithm")
+
+        mac = self._hmac.copy()
+        mac.update(f"{header_segment}.{payload_segment}".encode())
+        if not hmac.compare_digest(mac.digest(), signature):
+            raise InvalidTokenError("Signature verification failed")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as error:
+            raise InvalidTokenError("Malformed token") from error
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Malformed token")
+        nbf = claims.get("nbf")
+        if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > time.time()):
+            raise InvalidTokenError("Token is not yet valid")
+        return claims
+
+    def _verify(self, token: str) -> dict[str, Any]:
+        if self._hmac is not None:
+            return self._verify_hmac(token)
+        try:
+            return jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm],
+                options={"verify_exp": False},
+            )
+        except JWTError as error:
+            raise InvalidTokenError(str(error)) from error
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Return the claims of ``token`` or raise :class:`InvalidTokenError`."""
+
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                return claims
+            del self._entries[key]
+            raise InvalidTokenError("Token has expired")
+
+        claims = self._verify(token)
+        expires_at = claims.get("exp")
+        # Tokens without an expiry would stay valid forever; reject them.
+        if not isinstance(expires_at, (int, float)):
+            raise InvalidTokenError("Token has no expiry")
+        if expires_at <= now:
+            raise InvalidTokenError("Token has expired")
+
+        self._entries[key] = (expires_at, claims)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return claims
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier:
+    return TokenVerifier(
+        settings.jwt_secret_key,
+        settings.jwt_algorithm,
+        max_entries=settings.auth_token_cache_size,
+    )
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    email: str
+    name: str | None = None
+    user_id: int | None = None
+    role: str = ROLE_SUPERVISOR
+    company_id: int | None = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == ROLE_ADMIN
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    verifier: TokenVerifier = Depends(get_token_verifier),
+) -> CurrentUser:
+    if credentials is None:
+        raise _unauthorized("No autenticado")
+    try:
+        claims = verifier.verify(credentials.credentials)
+    except InvalidTokenError:
+        raise _unauthorized("Token inválido o expirado")
+    subject = claims.get("sub")
+    if not isinstance(subject, str):
+        raise _unauthorized("Token inválido o expirado")
+    user = CurrentUser(
+        email=subject,
+        name=claims.get("name"),
+        user_id=claims.get("uid"),
+        role=claims.get("role", ROLE_SUPERVISOR),
+        company_id=claims.get("company_id"),
+    )
+    if not user.is_admin:
+        if user.company_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Usuario sin empresa asignada"
+            )
+        set_current_company_id(user.company_id)
+    return user
+
+
+async def require_admin(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes")
+    return user
+
+
+__all__ = [
+    "ROLE_ADMIN",
+    "ROLE_SUPERVISOR",
+    "CurrentUser",
+    "InvalidTokenError",
+    "TokenVerifier",
+    "create_access_token",
+    "get_current_user",
+    "get_token_verifier",
+    "hash_password",
+    "hash_password_async",
+    "needs_rehash",
+    "require_admin",
+    "verify_password",
+    "verify_password_async",
+]
@@ -1,21 +1,296 @@
+import asyncio
+import contextvars
+import mimetypes
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, TypeVar
+from uuid import uuid4
+
+import certifi
+import urllib3
 from minio import Minio
+from minio.error import S3Error
 
 from app.core.config import settings
+from app.core.metrics import storage_operation_duration
+
+T = TypeVar("T")
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Buckets already confirmed to exist, shared by every backend instance in the
+# process so the bucket_exists round-trip happens once rather than per upload.
+_verified_buckets: set[str] = set()
+_bucket_lock = threading.Lock()
+
+
+class ObjectTooLargeError(ValueError):
+    """Raised when a stream exceeds the configured maximum object size."""
+
+
+class SizeLimitedReader:
+    """File-like wrapper that fails once more than ``max_bytes`` are read."""
+
+    def __init__(self, stream: BinaryIO, max_bytes: int) -> None:
+        self._stream = stream
+        self._max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self._max_bytes:
+            raise ObjectTooLargeError(f"Object exceeds the maximum size of {self._max_bytes} bytes")
+        return chunk
+
+
+@dataclass(frozen=True)
+class ObjectStat:
+    size: int
+    content_type: str | None
+
+
+def _limit(stream: BinaryIO, length: int, max_size: int | None) -> BinaryIO:
+    if max_size is None:
+        return stream
+    if length > max_size:
+        raise ObjectTooLargeError(f"Object exceeds the maximum size of {max_size} bytes")
+    return SizeLimitedReader(stream, max_size)
+
+
+class StorageBackend(ABC):
+    """Async object storage interface used by the routers and services.
+
+    Implementations wrap blocking clients in a dedicated thread pool so
+    storage latency never stalls the event loop.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await loop.run_in_executor(
+                self._executor, partial(context.run, func, *args, **kwargs)
+            )
+            outcome = "ok"
+            return result
+        finally:
+            storage_operation_duration.observe(
+                time.perf_counter() - started,
+                backend=type(self).__name__,
+                operation=func.__name__.lstrip("_"),
+                outcome=outcome,
+            )
+
+    async def put_object(
+        self,
+        object_name: str,
+        stream: BinaryIO,
+        length: int = -1,
+        content_type: str = "application/octet-stream",
+        max_size: int | None = None,
+    ) -> None:
+        """Store ``stream`` under ``object_name`` without buffering it whole.
+
+        Raises :class:`ObjectTooLargeError` when more than ``max_size`` bytes
+        are read.
+        """
+
+        await self._run(
+            self._put_object, object_name, _limit(stream, length, max_size), length, content_type
+        )
+
+    async def stat_object(self, object_name: str) -> ObjectStat | None:
+        """Return size and content type of ``object_name``, or None if missing."""
+
+        return await self._run(self._stat_object, object_name)
+
+    async def object_exists(self, object_name: str) -> bool:
+        return await self.stat_object(object_name) is not None
+
+    async def remove_object(self, object_name: str) -> None:
+        await self._run(self._remove_object, object_name)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    @abstractmethod
+    async def presigned_put_url(self, object_name: str, expires: timedelta) -> str:
+        """URL a client can PUT the object bytes to directly, bypassing the API."""
+
+    @abstractmethod
+    async def presigned_get_url(self, object_name: str, expires: timedelta) -> str:
+        """URL a client can download the object from directly."""
+
+    @abstractmethod
+    def _put_object(self, object_name: str, stream: BinaryIO, length: int, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def _stat_object(self, object_name: str) -> ObjectStat | None:
+        ...
+
+    @abstractmethod
+    def _remove_object(self, object_name: str) -> None:
+        ...
+
+
+def _build_http_client() -> urllib3.PoolManager:
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=settings.minio_max_pool_connections,
+        block=True,
+        timeout=urllib3.Timeout(
+            connect=settings.minio_connect_timeout, read=settings.minio_read_timeout
+        ),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+
+
+def build_minio_client(endpoint: str | None = None) -> Minio:
+    # A fixed region keeps presigning purely local; otherwise the client looks
+    # the bucket region up over the network before signing.
+    return Minio(
+        endpoint or settings.minio_endpoint,
+        access_key=settings.minio_access_key,
+        secret_key=settings.minio_secret_key,
+        secure=settings.minio_secure,
+        region=settings.minio_region,
+        http_client=_build_http_client(),
+    )
+
+
+class MinioStorage(StorageBackend):
+    def __init__(
+        self, bucket_name: str, client: Minio | None = None, presign_client: Minio | None = None
+    ) -> None:
+        # One thread per pooled connection; more threads would only queue on
+        # the blocking pool.
+        super().__init__(max_workers=settings.minio_max_pool_connections)
+        self.bucket_name = bucket_name
+        self.client = client or build_minio_client()
+        # Signatures cover the host, so URLs handed to browsers must be signed
+        # for the public endpoint rather than the internal service name.
+        if presign_client is None and settings.minio_public_endpoint:
+            presign_client = build_minio_client(settings.minio_public_endpoint)
+        self.presign_client = presign_client or self.client
+
+    def _ensure_bucket(self) -> None:
+        if self.bucket_name in _verified_buckets:
+            return
+        with _bucket_lock:
+            if self.bucket_name in _verified_buckets:
+                return
+            if not self.client.bucket_exists(self.bucket_name):
+                self.client.make_bucket(self.bucket_name)
+            _verified_buckets.add(self.bucket_name)
+
+    def _put_object(self, object_name: str, stream: BinaryIO, length: int, content_type: str) -> None:
+        self._ensure_bucket()
+        # With an unknown length MinIO needs an explicit part size and sends a
+        # multipart upload, holding a single part in memory at a time.
+        self.client.put_object(
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            data=stream,
+            length=length,
+            content_type=content_type,
+            part_size=settings.minio_part_size if length < 0 else 0,
+        )
+
+    def _stat_object(self, object_name: str) -> ObjectStat | None:
+        try:
+            stat = self.client.stat_object(self.bucket_name, object_name)
+        except S3Error as error:
+            if error.code in {"NoSuchKey", "NoSuchObject", "NoSuchBucket"}:
+                return None
+            raise
+        return ObjectStat(size=stat.size, content_type=stat.content_type)
+
+    def _remove_object(self, object_name: str) -> None:
+        self.client.remove_object(self.bucket_name, object_name)
+
+    async def presigned_put_url(self, object_name: str, expires: timedelta) -> str:
+        await self._run(self._ensure_bucket)
+        return self.presign_client.presigned_put_object(self.bucket_name, object_name, expires)
+
+    async def presigned_get_url(self, object_name: str, expires: timedelta) -> str:
+        return self.presign_client.presigned_get_object(self.bucket_name, object_name, expires)
+
+
+class LocalStorage(StorageBackend):
+    """Filesystem backend with the same interface, for tests and benchmarks."""
+
+    def __init__(self, root: str | os.PathLike[str], max_workers: int = 8) -> None:
+        super().__init__(max_workers=max_workers)
+        self.root = Path(root)
+
+    def path_for(self, object_name: str) -> Path:
+        path = (self.root / object_name).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid object name: {object_name}")
+        return path
+
+    def _put_object(self, object_name: str, stream: BinaryIO, length: int, content_type: str) -> None:
+        path = self.path_for(object_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_name(f".{path.name}.{uuid4().hex}.part")
+        try:
+            with open(partial_path, "wb") as target:
+                shutil.copyfileobj(stream, target, COPY_CHUNK_SIZE)
+            os.replace(partial_path, path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+    def _stat_object(self, object_name: str) -> ObjectStat | None:
+        path = self.path_for(object_name)
+        if not path.is_file():
+            return None
+        # Files carry no metadata; guess from the name as a browser would.
+        content_type, _ = mimetypes.guess_type(path.name)
+        return ObjectStat(size=path.stat().st_size, content_type=content_type)
+
+    def _remove_object(self, object_name: str) -> None:
+        self.path_for(object_name).unlink(missing_ok=True)
 
+    # There is no server to sign for; file URLs let local tooling write and
+    # read objects directly, mirroring the presigned flow.
+    async def presigned_put_url(self, object_name: str, expires: timedelta) -> str:
+        return self.path_for(object_name).as_uri()
 
-client = Minio(
-    settings.minio_endpoint,
-    access_key=settings.minio_access_key,
-    secret_key=settings.minio_secret_key,
-    secure=settings.minio_secure,
-)
+    async def presigned_get_url(self, object_name: str, expires: timedelta) -> str:
+        return self.path_for(object_name).as_uri()
 
 
-def ensure_bucket_exists(bucket_name: str) -> None:
-    if not client.bucket_exists(bucket_name):
-        client.make_bucket(bucket_name)
+@lru_cache
+def get_storage() -> StorageBackend:
+    if settings.storage_backend == "local":
+        return LocalStorage(settings.local_storage_path)
+    return MinioStorage(settings.minio_bucket)
 
 
-def upload_object(bucket_name: str, object_name: str, file_path: str) -> None:
-    ensure_bucket_exists(bucket_name)
-    client.fput_object(bucket_name=bucket_name, object_name=object_name, file_path=file_path)
+__all__ = [
+    "LocalStorage",
+    "MinioStorage",
+    "ObjectStat",
+    "ObjectTooLargeError",
+    "SizeLimitedReader",
+    "StorageBackend",
+    "build_minio_client",
+    "get_storage",
+]
@@ -0,0 +1,97 @@
+"""Company scoping for supervisor requests.
+
+Authentication records the caller's company in a context variable, and a
+``do_orm_execute`` hook adds the matching criteria to every ORM statement a
+session runs, so routers and services cannot forget the filter. Admins,
+background jobs and unauthenticated routes run with no company set and see
+everything.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from app.models.db import Alert, Company, CompanyOwned, Document, Expiration
+
+# Execution option that lifts the filter for one statement.
+ALL_COMPANIES = "all_companies"
+
+_company_id: ContextVar[int | None] = ContextVar("company_id", default=None)
+
+
+def current_company_id(session: Session | None = None) -> int | None:
+    """The company the current request is limited to, or None for all.
+
+    ``session.info["company_id"]`` takes precedence, which lets code outside
+    a request scope a session explicitly.
+    """
+
+    if session is not None and "company_id" in session.info:
+        return session.info["company_id"]
+    return _company_id.get()
+
+
+def set_current_company_id(company_id: int | None) -> Token:
+    return _company_id.set(company_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_company(state: ORMExecuteState) -> None:
+    # Column and relationship loads inherit the criteria of the statement
+    # that loaded their parent.
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if state.execution_options.get(ALL_COMPANIES):
+        return
+    company_id = current_company_id(state.session)
+    if company_id is None:
+        return
+
+    company_documents = select(Document.id).where(Document.company_id == company_id)
+    company_expirations = select(Expiration.id).where(
+        Expiration.document_id.in_(company_documents)
+    )
+    state.statement = state.statement.options(
+        with_loader_criteria(Company, Company.id == company_id, include_aliases=True),
+        *(
+            with_loader_criteria(model, model.company_id == company_id, include_aliases=True)
+            for model in CompanyOwned.__subclasses__()
+        ),
+        with_loader_criteria(
+            Expiration, Expiration.document_id.in_(company_documents), include_aliases=True
+        ),
+        with_loader_criteria(
+            Alert, Alert.expiration_id.in_(company_expirations), include_aliases=True
+        ),
+    )
+
+
+class TenantMiddleware:
+    """Clears the company scope around each request.
+
+    Authentication sets the scope part-way through the request; resetting it
+    here keeps it from outliving the request, including streamed bodies.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        token = _company_id.set(None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _company_id.reset(token)
+
+
+__all__ = [
+    "ALL_COMPANIES",
+    "TenantMiddleware",
+    "current_company_id",
+    "set_current_company_id",
+]
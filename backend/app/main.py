@@ -1,10 +1,57 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
+from app.core.database import SessionLocal, engine, replica_engine, warm_up_pool
+from app.core.metrics import REGISTRY, MetricsMiddleware, instrument_sqlalchemy
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.tenancy import TenantMiddleware
 from app.routers import api_router
+from app.services.mailer import close_mailer
+from app.services.user_service import ensure_admin_user
+from app.workers.scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_pool_warmup:
+        await warm_up_pool(engine, settings.db_pool_size)
+        if replica_engine is not None:
+            await warm_up_pool(replica_engine, settings.db_pool_size)
+
+    try:
+        async with SessionLocal() as session:
+            await ensure_admin_user(session)
+    except SQLAlchemyError:
+        # Typically the schema is not there yet; the API can still start.
+        logger.exception("Could not create the initial admin user")
 
-app = FastAPI(title=settings.app_name)
+    # Every gunicorn worker starts a scheduler; the advisory lock lets only
+    # one of them run the jobs.
+    if settings.scheduler_enabled:
+        get_scheduler().start()
+    yield
+    if settings.scheduler_enabled:
+        await get_scheduler().stop()
+    close_mailer()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.add_middleware(TenantMiddleware)
+
+if settings.metrics_enabled:
+    instrument_sqlalchemy()
+    app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 app.include_router(api_router)
 
@@ -19,3 +67,8 @@ app.include_router(api_router)
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
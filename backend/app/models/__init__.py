@@ -1,12 +1,31 @@
-from app.models.db import Alert, Base, Company, Document, Expiration, Worker
+from app.models.db import (
+    Alert,
+    Base,
+    Company,
+    CompanyOwned,
+    CompanyStats,
+    Document,
+    Expiration,
+    JobCheckpoint,
+    OutboxMessage,
+    StoredObject,
+    User,
+    Worker,
+)
 from app.models import schemas
 
 __all__ = [
     "Alert",
     "Base",
     "Company",
+    "CompanyOwned",
+    "CompanyStats",
     "Document",
     "Expiration",
+    "JobCheckpoint",
+    "OutboxMessage",
+    "StoredObject",
+    "User",
     "Worker",
     "schemas",
 ]
@@ -2,56 +2,128 @@ from __future__ import annotations
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """Timezone-aware datetime stored and returned in UTC.
+
+    PostgreSQL keeps the offset natively, but SQLite drops it, which breaks
+    both comparisons against aware values in Python and the lexicographic
+    ordering used by set-based statements. Normalizing to UTC on the way in
+    and tagging naive values on the way out keeps both backends consistent.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class CompanyOwned:
+    """Marks models with a ``company_id`` that tenant scoping filters on."""
+
+    company_id: Mapped[int]
+
+
 class Company(Base):
     __tablename__ = "companies"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     tax_id: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
-    compliance_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    contact_email: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    compliance_expires_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
 
     workers: Mapped[list["Worker"]] = relationship(back_populates="company", cascade="all, delete-orphan")
     documents: Mapped[list["Document"]] = relationship(back_populates="company", cascade="all, delete-orphan")
 
 
-class Worker(Base):
+class Worker(CompanyOwned, Base):
     __tablename__ = "workers"
+    # Company-scoped lists filter on company_id and page by id.
+    __table_args__ = (Index("ix_workers_company_id_id", "company_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
+    )
     first_name: Mapped[str] = mapped_column(String(255), nullable=False)
     last_name: Mapped[str] = mapped_column(String(255), nullable=False)
     email: Mapped[str] = mapped_column(String(255), nullable=False)
-    certification_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    certification_expires_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
 
     company: Mapped[Company] = relationship(back_populates="workers")
     documents: Mapped[list["Document"]] = relationship(back_populates="worker", cascade="all, delete-orphan")
 
 
-class Document(Base):
+class Document(CompanyOwned, Base):
     __tablename__ = "documents"
+    # (company_id, id) also answers the scoping subquery on expirations and
+    # alerts from the index alone.
+    __table_args__ = (
+        Index("ix_documents_company_id_id", "company_id", "id"),
+        Index("ix_documents_worker_id_id", "worker_id", "id"),
+        # Content-addressed blobs are shared; any other object belongs to one
+        # document, which deletes it from storage along with itself.
+        Index(
+            "ix_documents_file_key_exclusive",
+            "file_key",
+            unique=True,
+            postgresql_where=text("file_key NOT LIKE 'blobs/%'"),
+            sqlite_where=text("file_key NOT LIKE 'blobs/%'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
-    worker_id: Mapped[int] = mapped_column(ForeignKey("workers.id", ondelete="SET NULL"), nullable=True)
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
+    )
+    worker_id: Mapped[int] = mapped_column(
+        ForeignKey("workers.id", ondelete="SET NULL"), nullable=True
+    )
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     file_key: Mapped[str] = mapped_column(String(512), nullable=False)
-    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    expires_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        UTCDateTime, default=_utcnow, onupdate=_utcnow, server_default=func.now(), index=True
+    )
 
     company: Mapped[Company] = relationship(back_populates="documents")
     worker: Mapped[Worker | None] = relationship(back_populates="documents")
@@ -62,11 +134,36 @@ class Document(Base):
 
 class Expiration(Base):
     __tablename__ = "expirations"
+    __table_args__ = (
+        Index("ix_expirations_status_expires_at", "status", "expires_at"),
+        # Only rows still waiting for a reminder schedule. Finished schedules
+        # also have next_alert_at NULL, so the plain index would make the
+        # backfill scan every one of them.
+        Index(
+            "ix_expirations_unscheduled",
+            "id",
+            postgresql_where=text("next_alert_at IS NULL AND alert_stage IS NULL"),
+            sqlite_where=text("next_alert_at IS NULL AND alert_stage IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # One expiration per document; verify_expirations relies on it.
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, unique=True, index=True
+    )
+    expires_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False, index=True)
     status: Mapped[str] = mapped_column(String(50), nullable=False, default="pending")
+    # Reminder schedule: when the next reminder is due (None once the last
+    # stage was sent) and the most urgent stage sent so far, in days before
+    # expiry.
+    next_alert_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True, index=True)
+    alert_stage: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Bumped whenever expires_at moves and the schedule restarts, so a date
+    # moved away and back does not reuse the previous cycle's outbox keys.
+    alert_cycle: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     document: Mapped[Document] = relationship(back_populates="expiration")
     alerts: Mapped[list["Alert"]] = relationship(back_populates="expiration", cascade="all, delete-orphan")
@@ -74,15 +171,106 @@ class Expiration(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    # Serves the "already alerted on this channel" anti-join as well as
+    # lookups by expiration alone.
+    __table_args__ = (Index("ix_alerts_expiration_id_channel", "expiration_id", "channel"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    expiration_id: Mapped[int] = mapped_column(ForeignKey("expirations.id", ondelete="CASCADE"), nullable=False)
+    expiration_id: Mapped[int] = mapped_column(
+        ForeignKey("expirations.id", ondelete="CASCADE"), nullable=False
+    )
     channel: Mapped[str] = mapped_column(String(50), nullable=False, default="email")
-    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
+    outbox_id: Mapped[int | None] = mapped_column(
+        ForeignKey("outbox_messages.id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
     expiration: Mapped[Expiration] = relationship(back_populates="alerts")
 
 
+class OutboxMessage(Base):
+    """Email queued by the alert job and delivered by the outbox worker.
+
+    The Alert rows it covers are created with it, unsent, so an expiration is
+    never queued twice; delivery stamps their ``sent_at``. A message that
+    gives up releases its idempotency key so the alerts can be queued again.
+    """
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (Index("ix_outbox_messages_status_available_at", "status", "available_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(255), unique=True, nullable=True)
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False, default=_utcnow)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
+    sent_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
+
+
+class StoredObject(Base):
+    """Content-addressed object shared by every document with the same bytes."""
+
+    __tablename__ = "stored_objects"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_key: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
+    released_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
+
+
+class CompanyStats(CompanyOwned, Base):
+    """Per-company counts for the dashboard, see refresh_company_stats."""
+
+    __tablename__ = "company_stats"
+
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True
+    )
+    vigentes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    por_vencer: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    vencidos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    workers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    documents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False)
+
+
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    last_run_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False)
+    parameters: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+
+class User(Base):
+    """A person who can log in.
+
+    Admins see every company; supervisors are limited to ``company_id``.
+    """
+
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Stored lowercased so lookups can use the unique index directly.
+    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    full_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    role: Mapped[str] = mapped_column(String(20), nullable=False, default="supervisor")
+    company_id: Mapped[int | None] = mapped_column(
+        ForeignKey("companies.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
+
+
 __all__ = [
     "Base",
     "Company",
@@ -90,4 +278,11 @@ __all__ = [
     "Document",
     "Expiration",
     "Alert",
+    "CompanyOwned",
+    "CompanyStats",
+    "JobCheckpoint",
+    "OutboxMessage",
+    "StoredObject",
+    "UTCDateTime",
+    "User",
 ]
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class LoginRequest(BaseModel):
@@ -17,6 +17,7 @@ class TokenResponse(BaseModel):
 class CompanyBase(BaseModel):
     name: str
     tax_id: str
+    contact_email: EmailStr | None = None
     compliance_expires_at: datetime | None = None
 
 
@@ -72,6 +73,43 @@ class DocumentRead(DocumentBase):
         from_attributes = True
 
 
+class BulkUploadMetadata(BaseModel):
+    title: str
+    worker_id: Optional[int] = None
+    expires_at: datetime | None = None
+
+
+class BulkUploadItem(BaseModel):
+    filename: str | None
+    success: bool
+    document: DocumentRead | None = None
+    detail: str | None = None
+
+
+class BulkUploadResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkUploadItem]
+
+
+class PresignedUploadRequest(BaseModel):
+    company_id: int
+    filename: str
+    content_type: str
+
+
+class PresignedUploadResponse(BaseModel):
+    file_key: str
+    upload_url: str
+    method: str = "PUT"
+    expires_in: int
+
+
+class PresignedDownloadResponse(BaseModel):
+    url: str
+    expires_in: int
+
+
 class ExpirationBase(BaseModel):
     document_id: int
     expires_at: datetime
@@ -84,11 +122,33 @@ class ExpirationCreate(ExpirationBase):
 
 class ExpirationRead(ExpirationBase):
     id: int
+    next_alert_at: Optional[datetime] = None
+    alert_stage: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class CompanyStatsRead(BaseModel):
+    company_id: int
+    name: str
+    vigentes: int
+    por_vencer: int
+    vencidos: int
+    workers: int
+    documents: int
+
+
+class StatisticsRead(BaseModel):
+    vigentes: int = 0
+    por_vencer: int = 0
+    vencidos: int = 0
+    workers: int = 0
+    documents: int = 0
+    refreshed_at: Optional[datetime] = None
+    companies: list[CompanyStatsRead] = []
+
+
 class AlertBase(BaseModel):
     expiration_id: int
     channel: str = "email"
@@ -104,3 +164,23 @@ class AlertRead(AlertBase):
 
     class Config:
         from_attributes = True
+
+
+class UserBase(BaseModel):
+    email: EmailStr
+    full_name: str
+    role: Literal["admin", "supervisor"] = "supervisor"
+    company_id: int | None = None
+
+
+class UserCreate(UserBase):
+    password: str = Field(min_length=8)
+
+
+class UserRead(UserBase):
+    id: int
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,13 +1,33 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.routers import alerts, auth, companies, documents, expirations, workers
+from app.core.security import get_current_user
+from app.routers import (
+    alerts,
+    auth,
+    companies,
+    documents,
+    expirations,
+    exports,
+    scheduler,
+    statistics,
+    users,
+    workers,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
-api_router.include_router(companies.router)
-api_router.include_router(workers.router)
-api_router.include_router(documents.router)
-api_router.include_router(expirations.router)
-api_router.include_router(alerts.router)
+
+# Everything except login requires a valid access token.
+protected = APIRouter(dependencies=[Depends(get_current_user)])
+protected.include_router(companies.router)
+protected.include_router(workers.router)
+protected.include_router(documents.router)
+protected.include_router(expirations.router)
+protected.include_router(alerts.router)
+protected.include_router(exports.router)
+protected.include_router(scheduler.router)
+protected.include_router(statistics.router)
+protected.include_router(users.router)
+api_router.include_router(protected)
 
 __all__ = ["api_router"]
@@ -1,21 +1,37 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
+from app.core.pagination import PageParams, paginate
+from app.core.security import require_admin
 from app.models.db import Alert
 from app.models.schemas import AlertRead
-from app.services.alert_service import send_document_alerts
+from app.services.alert_service import enqueue_document_alerts
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
 @router.get("/", summary="List alerts", response_model=list[AlertRead])
-async def list_alerts(session: AsyncSession = Depends(get_session)):
-    result = await session.scalars(select(Alert))
-    return result.all()
+async def list_alerts(
+    response: Response,
+    expiration_id: int | None = None,
+    channel: str | None = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+):
+    statement = select(Alert)
+    if expiration_id is not None:
+        statement = statement.where(Alert.expiration_id == expiration_id)
+    if channel is not None:
+        statement = statement.where(Alert.channel == channel)
+    return await paginate(session, statement, Alert.id, page, response)
 
 
-@router.post("/send", summary="Send email alerts")
-async def send_alerts(session: AsyncSession = Depends(get_session)):
-    return await send_document_alerts(session)
+@router.post(
+    "/send",
+    summary="Queue email alerts for delivery by the outbox worker",
+    dependencies=[Depends(require_admin)],
+)
+async def send_alerts(digest: bool | None = None, session: AsyncSession = Depends(get_session)):
+    return await enqueue_document_alerts(session, digest=digest)
@@ -1,19 +1,37 @@
-from fastapi import APIRouter, HTTPException, status
+import math
 
-from app.core.config import settings
-from app.core.security import create_access_token, verify_credentials
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.rate_limit import RateLimiter, get_login_rate_limiter
 from app.models.schemas import LoginRequest, TokenResponse
+from app.services.user_service import authenticate, issue_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(payload: LoginRequest) -> TokenResponse:
-    if not verify_credentials(payload.email, payload.password):
+async def login(
+    payload: LoginRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    limiter: RateLimiter = Depends(get_login_rate_limiter),
+) -> TokenResponse:
+    # Checked before hashing, so bursts are turned away without KDF work.
+    email_key = f"email:{payload.email.lower()}"
+    client = request.client.host if request.client else "unknown"
+    retry_after = limiter.hit(f"ip:{client}", email_key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos de inicio de sesión",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = await authenticate(session, payload.email, payload.password)
+    if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
 
-    token = create_access_token(
-        subject=payload.email,
-        additional_claims={"name": settings.admin_full_name},
-    )
-    return TokenResponse(access_token=token, token_type="bearer")
+    limiter.reset(email_key)
+    return TokenResponse(access_token=issue_token(user), token_type="bearer")
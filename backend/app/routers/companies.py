@@ -1,19 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import ResponseCache, get_cache, list_key
 from app.core.database import get_session
-from app.models.db import Company
+from app.core.pagination import PageParams, paginate
+from app.core.security import require_admin
+from app.core.storage import StorageBackend, get_storage
+from app.models.db import Company, Document, Worker
 from app.models.schemas import CompanyCreate, CompanyRead
+from app.routers.statistics import STATISTICS_CACHE_NAMESPACE
+from app.services.document_service import release_documents
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
 
 @router.get("/", summary="List companies", response_model=list[CompanyRead])
-async def list_companies(session: AsyncSession = Depends(get_session)):
-    result = await session.scalars(select(Company))
-    return result.all()
+async def list_companies(
+    request: Request,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    async def build(response: Response):
+        return await paginate(session, select(Company), Company.id, page, response)
+
+    return await cache.response(
+        request, list_key(request), build, list[CompanyRead], namespace="companies"
+    )
 
 
 @router.post(
@@ -21,9 +36,12 @@ async def list_companies(session: AsyncSession = Depends(get_session)):
     summary="Create company",
     response_model=CompanyRead,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin)],
 )
 async def create_company(
-    company: CompanyCreate, session: AsyncSession = Depends(get_session)
+    company: CompanyCreate,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
 ):
     existing = await session.scalar(select(Company).where(Company.tax_id == company.tax_id))
     if existing:
@@ -35,21 +53,33 @@ async def create_company(
     db_company = Company(**company.model_dump())
     session.add(db_company)
     await session.commit()
+    await cache.invalidate(namespaces=["companies"])
     await session.refresh(db_company)
     return db_company
 
 
 @router.get("/{company_id}", summary="Get company", response_model=CompanyRead)
-async def get_company(company_id: int, session: AsyncSession = Depends(get_session)):
-    company = await session.get(Company, company_id)
-    if not company:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
-    return company
+async def get_company(
+    company_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    async def build(response: Response):
+        company = await session.get(Company, company_id)
+        if not company:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+        return company
+
+    return await cache.response(request, f"company:{company_id}", build, CompanyRead)
 
 
 @router.put("/{company_id}", summary="Update company", response_model=CompanyRead)
 async def update_company(
-    company_id: int, company_update: CompanyCreate, session: AsyncSession = Depends(get_session)
+    company_id: int,
+    company_update: CompanyCreate,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
 ):
     company = await session.get(Company, company_id)
     if not company:
@@ -68,16 +98,41 @@ async def update_company(
         setattr(company, field, value)
 
     await session.commit()
+    # Statistics list companies by name.
+    await cache.invalidate(
+        keys=[f"company:{company_id}"], namespaces=["companies", STATISTICS_CACHE_NAMESPACE]
+    )
     await session.refresh(company)
     return company
 
 
-@router.delete("/{company_id}", summary="Delete company", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_company(company_id: int, session: AsyncSession = Depends(get_session)):
+@router.delete(
+    "/{company_id}",
+    summary="Delete company",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_admin)],
+)
+async def delete_company(
+    company_id: int,
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
+):
     company = await session.get(Company, company_id)
     if not company:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
 
+    worker_ids = await session.scalars(select(Worker.id).where(Worker.company_id == company_id))
+    # Workers and documents go with the company.
+    stale_keys = [f"company:{company_id}", *(f"worker:{worker_id}" for worker_id in worker_ids)]
+
+    exclusive_keys = await release_documents(session, Document.company_id == company_id)
     await session.delete(company)
     await session.commit()
+    await cache.invalidate(
+        keys=stale_keys,
+        namespaces=["companies", "workers", "documents", STATISTICS_CACHE_NAMESPACE],
+    )
+    for file_key in exclusive_keys:
+        await storage.remove_object(file_key)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,25 +1,98 @@
-import os
-from datetime import datetime
-from tempfile import NamedTemporaryFile
-from uuid import uuid4
+import asyncio
+import logging
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import ResponseCache, get_cache, list_key
 from app.core.config import settings
-from app.core.database import get_session
-from app.core.storage import upload_object
-from app.models.db import Document
-from app.models.schemas import DocumentRead
+from app.core.database import get_read_session, get_session
+from app.core.pagination import PageParams, paginate
+from app.core.storage import StorageBackend, get_storage
+from app.models.db import Company, Document, Worker
+from app.models.schemas import (
+    BulkUploadItem,
+    BulkUploadMetadata,
+    BulkUploadResponse,
+    DocumentCreate,
+    DocumentRead,
+    PresignedDownloadResponse,
+    PresignedUploadRequest,
+    PresignedUploadResponse,
+)
+from app.services.document_service import (
+    HashedUpload,
+    UploadRejected,
+    acquire_blobs,
+    build_object_name,
+    ensure_allowed_content_type,
+    hash_upload,
+    release_object,
+    reserve_blobs,
+    store_blob,
+    store_upload,
+    stored_hashes,
+    verify_direct_upload,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/documentos", tags=["documents"])
 
 
 @router.get("/", summary="List documents", response_model=list[DocumentRead])
-async def list_documents(session: AsyncSession = Depends(get_session)):
-    result = await session.scalars(select(Document))
-    return result.all()
+async def list_documents(
+    request: Request,
+    company_id: int | None = None,
+    worker_id: int | None = None,
+    expires_after: datetime | None = None,
+    expires_before: datetime | None = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    statement = select(Document)
+    if company_id is not None:
+        statement = statement.where(Document.company_id == company_id)
+    if worker_id is not None:
+        statement = statement.where(Document.worker_id == worker_id)
+    if expires_after is not None:
+        statement = statement.where(Document.expires_at >= expires_after)
+    if expires_before is not None:
+        statement = statement.where(Document.expires_at <= expires_before)
+
+    async def build(response: Response):
+        return await paginate(session, statement, Document.id, page, response)
+
+    return await cache.response(
+        request, list_key(request), build, list[DocumentRead], namespace="documents"
+    )
+
+
+async def _ensure_worker_in_company(
+    session: AsyncSession, worker_id: int | None, company_id: int
+) -> None:
+    # Scoped lookups hide other tenants' workers from supervisors; the
+    # company check also keeps admins from mixing companies, as bulk does.
+    if worker_id is None:
+        return
+    worker = await session.get(Worker, worker_id)
+    if worker is None or worker.company_id != company_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Worker not found")
 
 
 @router.post(
@@ -35,30 +108,17 @@ async def upload_document(
     worker_id: int | None = Form(None),
     expires_at: datetime | None = Form(None),
     session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
 ):
-    allowed_types = {"application/pdf", "image/jpeg", "image/jpg"}
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Formato de archivo no permitido. Solo se aceptan PDF o JPG",
-        )
-
-    object_name = f"companies/{company_id}/{uuid4()}_{file.filename}"
-
-    temp_file = NamedTemporaryFile(delete=False)
+    # Company lookups are scoped, so this also rejects other tenants' ids.
+    if await session.get(Company, company_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+    await _ensure_worker_in_company(session, worker_id, company_id)
     try:
-        content = await file.read()
-        temp_file.write(content)
-        temp_file.flush()
-
-        upload_object(
-            bucket_name=settings.minio_bucket,
-            object_name=object_name,
-            file_path=temp_file.name,
-        )
-    finally:
-        temp_file.close()
-        os.unlink(temp_file.name)
+        object_name = await store_upload(session, storage, file)
+    except UploadRejected as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
 
     document = Document(
         company_id=company_id,
@@ -69,6 +129,247 @@ async def upload_document(
     )
     session.add(document)
     await session.commit()
+    await cache.invalidate(namespaces=["documents"])
     await session.refresh(document)
 
     return document
+
+
+_bulk_metadata_adapter = TypeAdapter(list[BulkUploadMetadata])
+
+
+def _failure_detail(filename: str | None, error: BaseException) -> str:
+    if isinstance(error, UploadRejected):
+        return error.detail
+    logger.error("Bulk upload of %s failed", filename, exc_info=error)
+    return "Error al almacenar el archivo"
+
+
+@router.post(
+    "/bulk",
+    summary="Upload many documents",
+    response_model=BulkUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_documents_bulk(
+    company_id: int = Form(...),
+    metadata: str = Form(
+        ..., description="JSON list with title, worker_id and expires_at for each file, in order"
+    ),
+    files: list[UploadFile] = File(...),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
+):
+    try:
+        entries = _bulk_metadata_adapter.validate_json(metadata)
+    except ValidationError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=error.errors(include_url=False)
+        )
+    if len(entries) != len(files):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La metadata debe tener una entrada por archivo",
+        )
+    if len(files) > settings.bulk_upload_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Se permiten como máximo {settings.bulk_upload_max_files} archivos por carga",
+        )
+    if await session.get(Company, company_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+
+    worker_ids = {entry.worker_id for entry in entries if entry.worker_id is not None}
+    known_workers = set()
+    if worker_ids:
+        known_workers = set(
+            await session.scalars(
+                select(Worker.id).where(Worker.id.in_(worker_ids), Worker.company_id == company_id)
+            )
+        )
+
+    semaphore = asyncio.Semaphore(settings.bulk_upload_concurrency)
+
+    async def prepare(file: UploadFile, entry: BulkUploadMetadata) -> HashedUpload:
+        if entry.worker_id is not None and entry.worker_id not in known_workers:
+            raise UploadRejected(status.HTTP_404_NOT_FOUND, "Worker not found")
+        async with semaphore:
+            return await hash_upload(file)
+
+    async def write(upload: HashedUpload) -> None:
+        async with semaphore:
+            await store_blob(storage, upload)
+
+    outcomes = await asyncio.gather(
+        *(prepare(file, entry) for file, entry in zip(files, entries)), return_exceptions=True
+    )
+
+    # Each distinct content is written at most once, and not at all when an
+    # identical object is already stored.
+    hashed = [outcome for outcome in outcomes if isinstance(outcome, HashedUpload)]
+    present = await stored_hashes(session, (upload.sha256 for upload in hashed))
+    pending = {upload.sha256: upload for upload in hashed if upload.sha256 not in present}
+    await reserve_blobs(session, pending.values())
+    written = await asyncio.gather(
+        *(write(upload) for upload in pending.values()), return_exceptions=True
+    )
+    write_errors = {
+        sha256: error for sha256, error in zip(pending, written) if isinstance(error, BaseException)
+    }
+    outcomes = [
+        write_errors.get(outcome.sha256, outcome) if isinstance(outcome, HashedUpload) else outcome
+        for outcome in outcomes
+    ]
+
+    stored = [
+        (entry, outcome)
+        for entry, outcome in zip(entries, outcomes)
+        if isinstance(outcome, HashedUpload)
+    ]
+    rows = [
+        {"company_id": company_id, "file_key": upload.file_key, **entry.model_dump()}
+        for entry, upload in stored
+    ]
+
+    # References and rows go in one INSERT ... RETURNING and a single commit.
+    documents = []
+    if rows:
+        await acquire_blobs(session, (upload for _, upload in stored))
+        documents = list(
+            await session.scalars(
+                insert(Document).returning(Document, sort_by_parameter_order=True), rows
+            )
+        )
+        await session.commit()
+        await cache.invalidate(namespaces=["documents"])
+
+    created = iter(documents)
+    results = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, HashedUpload):
+            document = DocumentRead.model_validate(next(created))
+            results.append(BulkUploadItem(filename=file.filename, success=True, document=document))
+        else:
+            detail = _failure_detail(file.filename, outcome)
+            results.append(BulkUploadItem(filename=file.filename, success=False, detail=detail))
+
+    return BulkUploadResponse(
+        created=len(documents), failed=len(files) - len(documents), results=results
+    )
+
+
+@router.delete(
+    "/{document_id}", summary="Delete document", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_document(
+    document_id: int,
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
+):
+    document = await session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    # Shared objects are only dereferenced here; unreferenced ones are removed
+    # later by purge_unreferenced_objects.
+    shared = await release_object(session, document.file_key)
+    await session.delete(document)
+    await session.commit()
+    await cache.invalidate(namespaces=["documents"])
+    if not shared:
+        await storage.remove_object(document.file_key)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _presigned_expiry() -> timedelta:
+    return timedelta(seconds=settings.presigned_url_expire_seconds)
+
+
+@router.post(
+    "/upload-url",
+    summary="Request a presigned upload URL",
+    response_model=PresignedUploadResponse,
+)
+async def request_upload_url(
+    payload: PresignedUploadRequest,
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    try:
+        ensure_allowed_content_type(payload.content_type)
+    except UploadRejected as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+    if await session.get(Company, payload.company_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+
+    file_key = build_object_name(payload.company_id, payload.filename)
+    upload_url = await storage.presigned_put_url(file_key, _presigned_expiry())
+    return PresignedUploadResponse(
+        file_key=file_key,
+        upload_url=upload_url,
+        expires_in=settings.presigned_url_expire_seconds,
+    )
+
+
+@router.post(
+    "/complete",
+    summary="Register a document uploaded through a presigned URL",
+    response_model=DocumentRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def complete_upload(
+    payload: DocumentCreate,
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
+):
+    if await session.get(Company, payload.company_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+    await _ensure_worker_in_company(session, payload.worker_id, payload.company_id)
+    # Presigned objects belong to exactly one document; deleting it removes
+    # the object, which would orphan any second registration.
+    registered = await session.scalar(
+        select(Document.id).where(Document.file_key == payload.file_key).limit(1)
+    )
+    if registered is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="El archivo ya está registrado"
+        )
+    try:
+        await verify_direct_upload(storage, payload.company_id, payload.file_key)
+    except UploadRejected as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+
+    document = Document(**payload.model_dump())
+    session.add(document)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent /complete registered the key after the check above.
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="El archivo ya está registrado"
+        )
+    await cache.invalidate(namespaces=["documents"])
+    await session.refresh(document)
+    return document
+
+
+@router.get(
+    "/{document_id}/download-url",
+    summary="Get a presigned download URL",
+    response_model=PresignedDownloadResponse,
+)
+async def get_download_url(
+    document_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    document = await session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    url = await storage.presigned_get_url(document.file_key, _presigned_expiry())
+    return PresignedDownloadResponse(url=url, expires_in=settings.presigned_url_expire_seconds)
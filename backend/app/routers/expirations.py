@@ -1,21 +1,55 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.cache import ResponseCache, get_cache
+from app.core.database import get_read_session, get_session
+from app.core.pagination import PageParams, paginate
+from app.core.security import require_admin
 from app.models.db import Expiration
 from app.models.schemas import ExpirationRead
-from app.services.expiration_service import verify_expirations
+from app.routers.statistics import STATISTICS_CACHE_NAMESPACE
+from app.services.expiration_service import refresh_company_stats, verify_expirations
 
 router = APIRouter(prefix="/expirations", tags=["expirations"])
 
 
 @router.get("/", summary="List expirations", response_model=list[ExpirationRead])
-async def list_expirations(session: AsyncSession = Depends(get_session)):
-    result = await session.scalars(select(Expiration))
-    return result.all()
+async def list_expirations(
+    response: Response,
+    status: str | None = None,
+    document_id: int | None = None,
+    expires_after: datetime | None = None,
+    expires_before: datetime | None = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+):
+    statement = select(Expiration)
+    if status is not None:
+        statement = statement.where(Expiration.status == status)
+    if document_id is not None:
+        statement = statement.where(Expiration.document_id == document_id)
+    if expires_after is not None:
+        statement = statement.where(Expiration.expires_at >= expires_after)
+    if expires_before is not None:
+        statement = statement.where(Expiration.expires_at <= expires_before)
+    return await paginate(session, statement, Expiration.id, page, response)
 
 
-@router.post("/verify", summary="Run expiration verification")
-async def run_verification(session: AsyncSession = Depends(get_session)):
-    return await verify_expirations(session)
+@router.post(
+    "/verify", summary="Run expiration verification", dependencies=[Depends(require_admin)]
+)
+async def run_verification(
+    full: bool = False,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    summary = await verify_expirations(session, full=full)
+    # Runs only pick up companies whose documents changed; a manual run also
+    # brings worker and document counts up to date.
+    await refresh_company_stats(session, datetime.now(timezone.utc))
+    await session.commit()
+    await cache.invalidate(namespaces=[STATISTICS_CACHE_NAMESPACE])
+    return summary
@@ -0,0 +1,34 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_read_session_factory
+from app.services.export_service import (
+    DOCUMENT_EXPORT_COLUMNS,
+    document_export_statement,
+    stream_rows,
+    to_csv,
+    to_ndjson,
+)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@router.get("/documents", summary="Export documents with worker, company and expiration")
+async def export_documents(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    company_id: int | None = None,
+    status: str | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    rows = stream_rows(session_factory, document_export_statement(company_id, status))
+
+    if format == "csv":
+        return StreamingResponse(
+            to_csv(rows, DOCUMENT_EXPORT_COLUMNS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="documents.csv"'},
+        )
+    return StreamingResponse(to_ndjson(rows), media_type="application/x-ndjson")
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from app.core.config import settings
+from app.core.security import require_admin
+from app.workers.scheduler import get_scheduler
+
+router = APIRouter(prefix="/scheduler", tags=["scheduler"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/jobs", summary="Run statistics of this process's scheduled jobs")
+async def list_jobs():
+    if not settings.scheduler_enabled:
+        return {"enabled": False, "leader": False, "jobs": {}}
+    scheduler = get_scheduler()
+    return {"enabled": True, "leader": scheduler.leader.held, "jobs": scheduler.metrics()}
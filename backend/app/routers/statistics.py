@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import ResponseCache, get_cache
+from app.core.database import get_session
+from app.models.db import Company, CompanyStats
+from app.models.schemas import CompanyStatsRead, StatisticsRead
+
+router = APIRouter(prefix="/estadisticas", tags=["estadisticas"])
+
+# A namespace rather than a key so invalidation reaches every company's copy.
+STATISTICS_CACHE_NAMESPACE = "estadisticas"
+
+_COUNTS = ("vigentes", "por_vencer", "vencidos", "workers", "documents")
+
+
+async def _load_statistics(session: AsyncSession) -> StatisticsRead:
+    # Served from the aggregates kept by refresh_company_stats, never from the
+    # expirations themselves.
+    result = await session.execute(
+        select(CompanyStats, Company.name)
+        .join(Company, Company.id == CompanyStats.company_id)
+        .order_by(Company.name)
+    )
+
+    statistics = StatisticsRead()
+    for stats, name in result:
+        company = CompanyStatsRead(
+            company_id=stats.company_id,
+            name=name,
+            **{field: getattr(stats, field) for field in _COUNTS},
+        )
+        statistics.companies.append(company)
+        for field in _COUNTS:
+            setattr(statistics, field, getattr(statistics, field) + getattr(company, field))
+        if statistics.refreshed_at is None or stats.refreshed_at > statistics.refreshed_at:
+            statistics.refreshed_at = stats.refreshed_at
+    return statistics
+
+
+@router.get("", summary="Compliance statistics per company", response_model=StatisticsRead)
+async def get_statistics(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    async def build(response: Response):
+        return await _load_statistics(session)
+
+    # Verification runs in the scheduler may happen in another process, so
+    # the entry also expires on its own.
+    return await cache.response(
+        request, "summary", build, StatisticsRead, namespace=STATISTICS_CACHE_NAMESPACE
+    )
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.pagination import PageParams, paginate
+from app.core.security import ROLE_SUPERVISOR, CurrentUser, require_admin
+from app.models.db import Company, User
+from app.models.schemas import UserCreate, UserRead
+from app.services.user_service import create_user
+
+router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/", summary="List users", response_model=list[UserRead])
+async def list_users(
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    return await paginate(session, select(User), User.id, page, response)
+
+
+@router.post(
+    "/",
+    summary="Create user",
+    response_model=UserRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_user_account(
+    payload: UserCreate,
+    session: AsyncSession = Depends(get_session),
+):
+    if payload.role == ROLE_SUPERVISOR:
+        if payload.company_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Los supervisores deben pertenecer a una empresa",
+            )
+        if await session.get(Company, payload.company_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+
+    existing = await session.scalar(select(User.id).where(User.email == payload.email.lower()))
+    if existing is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User with this email already exists",
+        )
+
+    return await create_user(
+        session,
+        email=payload.email,
+        password=payload.password,
+        full_name=payload.full_name,
+        role=payload.role,
+        company_id=payload.company_id,
+    )
+
+
+@router.delete("/{user_id}", summary="Deactivate user", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_user(
+    user_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(require_admin),
+):
+    user = await session.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if user.id == current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No puede desactivar su propia cuenta",
+        )
+
+    # Kept for audit; existing tokens remain valid until they expire.
+    user.is_active = False
+    await session.commit()
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import ResponseCache, get_cache, list_key
 from app.core.database import get_session
-from app.models.db import Company, Worker
+from app.core.pagination import PageParams, paginate
+from app.core.storage import StorageBackend, get_storage
+from app.models.db import Company, Document, Worker
 from app.models.schemas import WorkerCreate, WorkerRead
+from app.services.document_service import release_documents
 
 router = APIRouter(prefix="/workers", tags=["workers"])
 
@@ -16,9 +20,23 @@ def _ensure_company_exists(company: Company | None):
 
 
 @router.get("/", summary="List workers", response_model=list[WorkerRead])
-async def list_workers(session: AsyncSession = Depends(get_session)):
-    result = await session.scalars(select(Worker))
-    return result.all()
+async def list_workers(
+    request: Request,
+    company_id: int | None = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    statement = select(Worker)
+    if company_id is not None:
+        statement = statement.where(Worker.company_id == company_id)
+
+    async def build(response: Response):
+        return await paginate(session, statement, Worker.id, page, response)
+
+    return await cache.response(
+        request, list_key(request), build, list[WorkerRead], namespace="workers"
+    )
 
 
 @router.post(
@@ -28,7 +46,9 @@ async def list_workers(session: AsyncSession = Depends(get_session)):
     status_code=status.HTTP_201_CREATED,
 )
 async def create_worker(
-    worker: WorkerCreate, session: AsyncSession = Depends(get_session)
+    worker: WorkerCreate,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
 ):
     company = await session.get(Company, worker.company_id)
     _ensure_company_exists(company)
@@ -36,21 +56,33 @@ async def create_worker(
     db_worker = Worker(**worker.model_dump())
     session.add(db_worker)
     await session.commit()
+    await cache.invalidate(namespaces=["workers"])
     await session.refresh(db_worker)
     return db_worker
 
 
 @router.get("/{worker_id}", summary="Get worker", response_model=WorkerRead)
-async def get_worker(worker_id: int, session: AsyncSession = Depends(get_session)):
-    worker = await session.get(Worker, worker_id)
-    if not worker:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Worker not found")
-    return worker
+async def get_worker(
+    worker_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    async def build(response: Response):
+        worker = await session.get(Worker, worker_id)
+        if not worker:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Worker not found")
+        return worker
+
+    return await cache.response(request, f"worker:{worker_id}", build, WorkerRead)
 
 
 @router.put("/{worker_id}", summary="Update worker", response_model=WorkerRead)
 async def update_worker(
-    worker_id: int, worker_update: WorkerCreate, session: AsyncSession = Depends(get_session)
+    worker_id: int,
+    worker_update: WorkerCreate,
+    session: AsyncSession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
 ):
     worker = await session.get(Worker, worker_id)
     if not worker:
@@ -63,16 +95,27 @@ async def update_worker(
         setattr(worker, field, value)
 
     await session.commit()
+    await cache.invalidate(keys=[f"worker:{worker_id}"], namespaces=["workers"])
     await session.refresh(worker)
     return worker
 
 
 @router.delete("/{worker_id}", summary="Delete worker", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_worker(worker_id: int, session: AsyncSession = Depends(get_session)):
+async def delete_worker(
+    worker_id: int,
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+    cache: ResponseCache = Depends(get_cache),
+):
     worker = await session.get(Worker, worker_id)
     if not worker:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Worker not found")
 
+    # The worker's documents go with it.
+    exclusive_keys = await release_documents(session, Document.worker_id == worker_id)
     await session.delete(worker)
     await session.commit()
+    await cache.invalidate(keys=[f"worker:{worker_id}"], namespaces=["workers", "documents"])
+    for file_key in exclusive_keys:
+        await storage.remove_object(file_key)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
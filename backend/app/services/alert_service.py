@@ -1,33 +1,48 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import inspect
+import logging
 import smtplib
-from datetime import datetime, timezone
-from email.message import EmailMessage
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Awaitable, Callable
 
-from sqlalchemy import select
+from sqlalchemy import Select, delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
-from app.models.db import Alert, Document, Expiration
-from app.services.expiration_service import ExpirationStatus, verify_expirations
+from app.models.db import Alert, Company, Document, Expiration, OutboxMessage, Worker
+from app.services.expiration_service import (
+    next_reminder_at,
+    reached_reminder_stage,
+    verify_expirations,
+)
+from app.services.mailer import build_email, get_mailer
+
+logger = logging.getLogger(__name__)
 
 SendEmailCallable = Callable[[str, str, str], Awaitable[None] | None]
 
+WORKER_CHANNEL = "email"
+COMPANY_CHANNEL = "email_company"
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
 
-def _build_email(recipient: str, subject: str, body: str) -> EmailMessage:
-    message = EmailMessage()
-    message["Subject"] = subject
-    message["From"] = settings.smtp_from
-    message["To"] = recipient
-    message.set_content(body)
-    return message
+ALERT_CHUNK_SIZE = 1000
 
 
 def send_email_alert(recipient: str, subject: str, body: str) -> None:
-    message = _build_email(recipient, subject, body)
+    """Send a single message over a dedicated connection.
+
+    Batch jobs should use the pooled :func:`app.services.mailer.get_mailer`.
+    """
+
+    message = build_email(recipient, subject, body)
 
     with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
         if settings.smtp_use_tls:
@@ -44,72 +59,423 @@ async def _dispatch_email(
         await sender(recipient, subject, body)
         return
 
-    from asyncio import to_thread
+    await asyncio.to_thread(sender, recipient, subject, body)
 
-    await to_thread(sender, recipient, subject, body)
 
+@dataclass(frozen=True)
+class _Reminder:
+    expiration_id: int
+    title: str
+    status: str
+    expires_at: datetime
+    stage: int
+    cycle: int
 
-async def send_document_alerts(
+    @property
+    def key(self) -> str:
+        # The cycle tells a renewed document's reminders from the old ones,
+        # even when the date later moves back to a value already alerted.
+        return f"{self.expiration_id}/{self.cycle}@{self.expires_at.isoformat()}#{self.stage}"
+
+
+@dataclass
+class _AlertMessage:
+    recipient: str
+    channel: str
+    subject: str
+    body: str
+    reminders: list[_Reminder]
+
+    @property
+    def expiration_ids(self) -> list[int]:
+        return [reminder.expiration_id for reminder in self.reminders]
+
+
+def _single_message(reminder: _Reminder, recipient: str, channel: str) -> _AlertMessage:
+    return _AlertMessage(
+        recipient=recipient,
+        channel=channel,
+        subject=f"Alerta de documento {reminder.status}",
+        body=(
+            f"El documento '{reminder.title}' vence el {reminder.expires_at.date()} "
+            f"y se encuentra en estado: {reminder.status}."
+        ),
+        reminders=[reminder],
+    )
+
+
+def _digest_message(recipient: str, channel: str, reminders: list[_Reminder]) -> _AlertMessage:
+    lines = [
+        f"- '{reminder.title}' vence el {reminder.expires_at.date()} (estado: {reminder.status})"
+        for reminder in sorted(reminders, key=lambda item: item.expires_at)
+    ]
+    return _AlertMessage(
+        recipient=recipient,
+        channel=channel,
+        subject=f"Alerta de documentos: {len(reminders)} por vencer o vencidos",
+        body="Los siguientes documentos requieren atención:\n\n" + "\n".join(lines),
+        reminders=reminders,
+    )
+
+
+def _due_statement(now: datetime, include_company_contacts: bool) -> Select:
+    """Expirations whose next reminder is due, with what the messages need."""
+
+    statement = (
+        select(
+            Expiration.id,
+            Expiration.status,
+            Expiration.expires_at,
+            Expiration.alert_stage,
+            Expiration.alert_cycle,
+            Document.title,
+            Worker.email.label("worker_email"),
+        )
+        .join(Document, Document.id == Expiration.document_id)
+        .outerjoin(Worker, Worker.id == Document.worker_id)
+    )
+    if include_company_contacts:
+        statement = statement.add_columns(Company.contact_email.label("company_email")).join(
+            Company, Company.id == Document.company_id
+        )
+    # SKIP LOCKED keeps a concurrent run from queuing the same reminders.
+    return (
+        statement.where(Expiration.next_alert_at <= now)
+        .order_by(Expiration.id)
+        .with_for_update(of=Expiration, skip_locked=True)
+        .execution_options(yield_per=ALERT_CHUNK_SIZE)
+    )
+
+
+async def _collect_messages(
+    session: AsyncSession,
+    warning_days: int,
+    digest: bool,
+    include_company_contacts: bool,
+    now: datetime,
+) -> tuple[list[_AlertMessage], int, int]:
+    """Build messages for due reminders and advance each row's schedule.
+
+    Only rows with ``next_alert_at <= now`` are read, so the cost of a run
+    follows the number of reminders due rather than the number of
+    expirations or the alert history. A row is sent its most urgent stage
+    reached; stages skipped in between (e.g. after downtime) are not sent.
+    Returns the messages, the reminders skipped for lack of a recipient and
+    the rows that were only (re)scheduled because no new stage was due.
+    """
+
+    await verify_expirations(session, warning_days=warning_days, now=now)
+
+    skipped = 0
+    scheduled = 0
+    reminders: dict[tuple[str, str], list[_Reminder]] = defaultdict(list)
+    schedule: list[dict] = []
+
+    result = await session.stream(_due_statement(now, include_company_contacts))
+    async for row in result:
+        stage = reached_reminder_stage(row.expires_at, now, warning_days)
+        if stage is None or (row.alert_stage is not None and stage >= row.alert_stage):
+            scheduled += 1
+            stage = row.alert_stage
+        else:
+            reminder = _Reminder(
+                row.id, row.title, row.status, row.expires_at, stage, row.alert_cycle
+            )
+            recipients = [(WORKER_CHANNEL, row.worker_email)]
+            if include_company_contacts:
+                recipients.append((COMPANY_CHANNEL, row.company_email))
+            for channel, recipient in recipients:
+                if recipient:
+                    reminders[(channel, recipient)].append(reminder)
+                else:
+                    skipped += 1
+
+        schedule.append(
+            {
+                "id": row.id,
+                "alert_stage": stage,
+                "next_alert_at": next_reminder_at(row.expires_at, stage, warning_days),
+            }
+        )
+
+    if schedule:
+        await session.execute(update(Expiration), schedule)
+
+    if digest:
+        messages = [
+            _digest_message(recipient, channel, items)
+            for (channel, recipient), items in reminders.items()
+        ]
+    else:
+        messages = [
+            _single_message(reminder, recipient, channel)
+            for (channel, recipient), items in reminders.items()
+            for reminder in items
+        ]
+    return messages, skipped, scheduled
+
+
+def _idempotency_key(message: _AlertMessage) -> str:
+    keys = ",".join(sorted(reminder.key for reminder in message.reminders))
+    return hashlib.sha256(f"{message.channel}|{message.recipient}|{keys}".encode()).hexdigest()
+
+
+async def enqueue_document_alerts(
     session: AsyncSession,
-    send_email: SendEmailCallable | None = None,
     warning_days: int = 30,
+    *,
+    digest: bool | None = None,
+    include_company_contacts: bool | None = None,
+    now: datetime | None = None,
 ) -> dict[str, int]:
-    """Send email alerts for expiring or expired documents.
+    """Queue reminder emails for expirations whose next reminder is due.
 
-    The function synchronizes expiration statuses, finds documents whose
-    expirations are approaching or have passed, sends a single email per
-    document, and records the attempt in the ``alerts`` table.
+    The first reminder goes out ``warning_days`` before expiry, when the
+    document turns por vencer; ``settings.alert_reminder_days`` entries below
+    that add the later stages, and larger entries are ignored.
+    Outbox messages, their unsent Alert rows and the advanced reminder
+    schedule are written in one transaction, so a crash either queues a
+    reminder completely or not at all. Delivery is left to
+    :func:`deliver_outbox`.
+
+    In digest mode all due reminders of a recipient are listed in a single
+    message. Company contacts (``Company.contact_email``) can also be
+    alerted on their own channel.
+
+    Returns the number of outbox messages and Alert rows queued, reminders
+    ``skipped`` because the recipient has no email, and rows that were only
+    ``scheduled`` for a later stage.
     """
 
-    await verify_expirations(session, warning_days=warning_days)
+    digest = settings.alert_digest_enabled if digest is None else digest
+    if include_company_contacts is None:
+        include_company_contacts = settings.alert_company_contacts_enabled
 
-    result = await session.scalars(
-        select(Expiration)
-        .where(Expiration.status.in_([ExpirationStatus.POR_VENCER, ExpirationStatus.VENCIDO]))
-        .options(
-            selectinload(Expiration.document)
-            .selectinload(Document.worker),
-            selectinload(Expiration.alerts),
+    messages, skipped, scheduled = await _collect_messages(
+        session, warning_days, digest, include_company_contacts, now or datetime.now(timezone.utc)
+    )
+
+    if messages:
+        outbox_ids = await session.scalars(
+            insert(OutboxMessage).returning(OutboxMessage.id, sort_by_parameter_order=True),
+            [
+                {
+                    "idempotency_key": _idempotency_key(message),
+                    "recipient": message.recipient,
+                    "subject": message.subject,
+                    "body": message.body,
+                }
+                for message in messages
+            ],
+        )
+        await session.execute(
+            insert(Alert),
+            [
+                {"expiration_id": expiration_id, "channel": message.channel, "outbox_id": outbox_id}
+                for message, outbox_id in zip(messages, outbox_ids)
+                for expiration_id in message.expiration_ids
+            ],
+        )
+    await session.commit()
+
+    return {
+        "queued": len(messages),
+        "alerts_queued": sum(len(message.expiration_ids) for message in messages),
+        "skipped": skipped,
+        "scheduled": scheduled,
+    }
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    delay = settings.outbox_backoff_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.outbox_max_backoff_seconds))
+
+
+async def _claim_batch(
+    session: AsyncSession, now: datetime, batch_size: int
+) -> list[OutboxMessage]:
+    # SKIP LOCKED lets several workers claim disjoint batches; the lease in
+    # available_at makes a crashed worker's batch visible again later.
+    claimed_ids = list(
+        await session.scalars(
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    )
+    if not claimed_ids:
+        await session.commit()
+        return []
+
+    await session.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(claimed_ids))
+        .values(
+            attempts=OutboxMessage.attempts + 1,
+            available_at=now + timedelta(seconds=settings.outbox_lease_seconds),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    messages = list(
+        await session.scalars(
+            select(OutboxMessage)
+            .where(OutboxMessage.id.in_(claimed_ids))
+            .execution_options(populate_existing=True)
         )
     )
-    expirations = result.all()
+    await session.commit()
+    return messages
+
 
-    summary = {"alerts_sent": 0, "skipped": 0}
-    sender = send_email or send_email_alert
+async def deliver_outbox(
+    session: AsyncSession,
+    send_email: SendEmailCallable | None = None,
+    batch_size: int | None = None,
+) -> dict[str, int]:
+    """Claim one batch of queued messages and send it.
+
+    Delivery is at-least-once: a worker that dies after sending but before
+    recording the result leaves the message to be retried once its lease
+    expires. Failed messages are retried with exponential backoff; after
+    ``outbox_max_attempts`` they are marked failed, their unsent Alert rows
+    removed and their reminders made due again for the next alert run.
+    """
 
     now = datetime.now(timezone.utc)
+    messages = await _claim_batch(session, now, batch_size or settings.outbox_batch_size)
+    summary = {"claimed": len(messages), "sent": 0, "retried": 0, "failed": 0, "alerts_sent": 0}
+    if not messages:
+        return summary
 
-    for expiration in expirations:
-        document = expiration.document
-        worker = document.worker
+    sender = send_email or get_mailer().send
+    semaphore = asyncio.Semaphore(settings.smtp_pool_size)
 
-        if worker is None or not worker.email:
-            summary["skipped"] += 1
-            continue
+    async def deliver(message: OutboxMessage) -> None:
+        async with semaphore:
+            await _dispatch_email(sender, message.recipient, message.subject, message.body)
 
-        already_sent = any(alert.channel == "email" for alert in expiration.alerts)
-        if already_sent:
-            summary["skipped"] += 1
+    outcomes = await asyncio.gather(
+        *(deliver(message) for message in messages), return_exceptions=True
+    )
+
+    sent_at = datetime.now(timezone.utc)
+    sent_ids: list[int] = []
+    failed_ids: list[int] = []
+    retries = []
+    for message, outcome in zip(messages, outcomes):
+        if not isinstance(outcome, BaseException):
+            sent_ids.append(message.id)
             continue
 
-        subject = f"Alerta de documento {expiration.status}"
-        body = (
-            f"El documento '{document.title}' vence el {expiration.expires_at.date()} "
-            f"y se encuentra en estado: {expiration.status}."
+        logger.error("Alert email to %s failed", message.recipient, exc_info=outcome)
+        if message.attempts >= settings.outbox_max_attempts:
+            failed_ids.append(message.id)
+        retries.append(
+            {
+                "id": message.id,
+                "last_error": repr(outcome),
+                "available_at": sent_at + _retry_delay(message.attempts),
+            }
         )
 
-        await _dispatch_email(sender, worker.email, subject, body)
-
-        alert = Alert(
-            expiration_id=expiration.id,
-            channel="email",
-            sent_at=now,
+    if sent_ids:
+        await session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(sent_ids))
+            .values(status=OUTBOX_SENT, sent_at=sent_at, last_error=None)
+        )
+        alerts = await session.execute(
+            update(Alert).where(Alert.outbox_id.in_(sent_ids)).values(sent_at=sent_at)
+        )
+        summary["alerts_sent"] = alerts.rowcount
+    if retries:
+        await session.execute(update(OutboxMessage), retries)
+    if failed_ids:
+        await session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(failed_ids))
+            .values(status=OUTBOX_FAILED, idempotency_key=None)
+        )
+        # Make the reminder due again; with no stage recorded the next run
+        # sends the most urgent stage reached.
+        await session.execute(
+            update(Expiration)
+            .where(
+                Expiration.id.in_(
+                    select(Alert.expiration_id).where(
+                        Alert.outbox_id.in_(failed_ids), Alert.sent_at.is_(None)
+                    )
+                )
+            )
+            .values(next_alert_at=sent_at, alert_stage=None)
+        )
+        await session.execute(
+            delete(Alert).where(Alert.outbox_id.in_(failed_ids), Alert.sent_at.is_(None))
         )
-        session.add(alert)
-        summary["alerts_sent"] += 1
-
     await session.commit()
+
+    summary["sent"] = len(sent_ids)
+    summary["failed"] = len(failed_ids)
+    summary["retried"] = len(retries) - len(failed_ids)
+    return summary
+
+
+async def send_document_alerts(
+    session: AsyncSession,
+    send_email: SendEmailCallable | None = None,
+    warning_days: int = 30,
+    *,
+    digest: bool | None = None,
+    include_company_contacts: bool | None = None,
+) -> dict[str, int]:
+    """Queue due reminders and deliver them right away.
+
+    Reminders are queued with :func:`enqueue_document_alerts` (one email per
+    reminder, or one per recipient in digest mode) and the outbox is then
+    drained inline, which suits tests and one-off runs; the API and
+    scheduler only enqueue and leave delivery to the outbox worker.
+
+    ``alerts_sent`` counts delivered Alert rows. ``skipped`` counts
+    reminders without a recipient plus those whose send failed, which stay
+    queued for a retry. ``scheduled`` counts rows whose next stage is not
+    due yet. Digests also report ``emails_sent``.
+    """
+
+    queued = await enqueue_document_alerts(
+        session,
+        warning_days,
+        digest=digest,
+        include_company_contacts=include_company_contacts,
+    )
+
+    alerts_sent = 0
+    emails_sent = 0
+    while True:
+        delivered = await deliver_outbox(session, send_email=send_email)
+        alerts_sent += delivered["alerts_sent"]
+        emails_sent += delivered["sent"]
+        if delivered["claimed"] == 0 or delivered["sent"] == 0:
+            break
+
+    if digest is None:
+        digest = settings.alert_digest_enabled
+    summary = {
+        "alerts_sent": alerts_sent,
+        "skipped": queued["skipped"] + max(queued["alerts_queued"] - alerts_sent, 0),
+        "scheduled": queued["scheduled"],
+    }
+    if digest:
+        summary["emails_sent"] = emails_sent
     return summary
 
 
-__all__ = ["send_document_alerts", "send_email_alert"]
+__all__ = [
+    "COMPANY_CHANNEL",
+    "WORKER_CHANNEL",
+    "deliver_outbox",
+    "enqueue_document_alerts",
+    "send_document_alerts",
+    "send_email_alert",
+]
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO
+from uuid import uuid4
+
+from fastapi import UploadFile, status
+from sqlalchemy import ColumnElement, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import ObjectStat, ObjectTooLargeError, StorageBackend
+from app.models.db import Document, StoredObject
+
+ALLOWED_CONTENT_TYPES = {"application/pdf", "image/jpeg", "image/jpg"}
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_PREFIX = "blobs/sha256/"
+
+
+class UploadRejected(Exception):
+    """An uploaded file that cannot be stored, with the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class HashedUpload:
+    file: UploadFile
+    sha256: str
+    size: int
+
+    @property
+    def file_key(self) -> str:
+        return blob_key(self.sha256)
+
+
+def build_object_name(company_id: int, filename: str | None) -> str:
+    return f"companies/{company_id}/{uuid4()}_{filename}"
+
+
+def blob_key(sha256: str) -> str:
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256}"
+
+
+def ensure_allowed_content_type(content_type: str | None) -> None:
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise UploadRejected(
+            status.HTTP_400_BAD_REQUEST,
+            "Formato de archivo no permitido. Solo se aceptan PDF o JPG",
+        )
+
+
+def _too_large() -> UploadRejected:
+    return UploadRejected(
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        "El archivo supera el tamaño máximo permitido",
+    )
+
+
+def _digest(stream: BinaryIO, max_size: int) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        size += len(chunk)
+        if size > max_size:
+            raise ObjectTooLargeError(f"Object exceeds the maximum size of {max_size} bytes")
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.hexdigest(), size
+
+
+async def hash_upload(file: UploadFile) -> HashedUpload:
+    """Validate ``file`` and compute its SHA-256 from the local spool.
+
+    The spooled upload is already on this host, so reading it once to hash
+    is far cheaper than the object-store write it may let us skip.
+    """
+
+    ensure_allowed_content_type(file.content_type)
+    if file.size is not None and file.size > settings.max_upload_size_bytes:
+        raise _too_large()
+    try:
+        sha256, size = await asyncio.to_thread(_digest, file.file, settings.max_upload_size_bytes)
+    except ObjectTooLargeError:
+        raise _too_large()
+    return HashedUpload(file=file, sha256=sha256, size=size)
+
+
+async def stored_hashes(session: AsyncSession, hashes: Iterable[str]) -> set[str]:
+    """Return the hashes whose object is already stored and referenced."""
+
+    hashes = set(hashes)
+    if not hashes:
+        return set()
+    result = await session.scalars(
+        select(StoredObject.sha256).where(
+            StoredObject.sha256.in_(hashes), StoredObject.ref_count > 0
+        )
+    )
+    return set(result)
+
+
+async def store_blob(storage: StorageBackend, upload: HashedUpload) -> None:
+    await storage.put_object(
+        upload.file_key,
+        upload.file.file,
+        length=upload.size,
+        content_type=upload.file.content_type,
+    )
+
+
+async def _add_references(
+    session: AsyncSession,
+    uploads: Iterable[HashedUpload],
+    per_upload: int,
+    released_at: datetime | None,
+) -> None:
+    uploads = list(uploads)
+    if not uploads:
+        return
+
+    counts = Counter(upload.sha256 for upload in uploads)
+    rows = {
+        upload.sha256: {
+            "sha256": upload.sha256,
+            "file_key": upload.file_key,
+            "size": upload.size,
+            "content_type": upload.file.content_type,
+            "ref_count": counts[upload.sha256] * per_upload,
+            "released_at": released_at,
+        }
+        for upload in uploads
+    }
+
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        session.bind.dialect.name
+    )
+    if dialect_insert is not None:
+        statement = dialect_insert(StoredObject).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=[StoredObject.sha256],
+            set_={
+                "ref_count": StoredObject.ref_count + statement.excluded.ref_count,
+                "released_at": statement.excluded.released_at,
+            },
+        )
+        await session.execute(statement)
+        return
+
+    existing = set(
+        await session.scalars(select(StoredObject.sha256).where(StoredObject.sha256.in_(rows)))
+    )
+    for sha256, row in rows.items():
+        if sha256 in existing:
+            await session.execute(
+                update(StoredObject)
+                .where(StoredObject.sha256 == sha256)
+                .values(
+                    ref_count=StoredObject.ref_count + row["ref_count"], released_at=released_at
+                )
+            )
+        else:
+            session.add(StoredObject(**row))
+
+
+async def reserve_blobs(session: AsyncSession, uploads: Iterable[HashedUpload]) -> None:
+    """Record objects about to be written as unreferenced, and commit.
+
+    Called before the write, so an object whose document never gets
+    committed still has a row, and purge_unreferenced_objects removes it
+    once the grace period has passed. Existing rows only have their
+    release time pushed back, which also keeps a pending purge away.
+    """
+
+    await _add_references(session, uploads, 0, datetime.now(timezone.utc))
+    await session.commit()
+
+
+async def acquire_blobs(session: AsyncSession, uploads: Iterable[HashedUpload]) -> None:
+    """Add one reference per upload, creating ``stored_objects`` rows as needed.
+
+    Runs in the caller's transaction so references and documents are
+    committed together.
+    """
+
+    await _add_references(session, uploads, 1, None)
+
+
+async def store_upload(session: AsyncSession, storage: StorageBackend, file: UploadFile) -> str:
+    """Store ``file`` under its content address and return the object key.
+
+    When identical bytes are already stored the object write is skipped;
+    otherwise the object is reserved (and committed) before it is written.
+    The reference is added to the session; the caller commits it together
+    with the document row.
+    """
+
+    upload = await hash_upload(file)
+    if upload.sha256 not in await stored_hashes(session, [upload.sha256]):
+        await reserve_blobs(session, [upload])
+        await store_blob(storage, upload)
+    await acquire_blobs(session, [upload])
+    return upload.file_key
+
+
+async def release_object(session: AsyncSession, file_key: str) -> bool:
+    """Drop one reference to ``file_key``.
+
+    Returns False when the key is not content-addressed, meaning the object
+    belongs to a single document and can be removed by the caller.
+    """
+
+    if not file_key.startswith(BLOB_PREFIX):
+        return False
+    await session.execute(
+        update(StoredObject)
+        .where(StoredObject.file_key == file_key)
+        .values(
+            ref_count=StoredObject.ref_count - 1,
+            released_at=datetime.now(timezone.utc),
+        )
+    )
+    return True
+
+
+async def release_documents(session: AsyncSession, *criteria: ColumnElement[bool]) -> list[str]:
+    """Drop the object references of the documents matching ``criteria``.
+
+    For deletes that remove documents in bulk, such as a company or worker
+    going with its documents. Call before the delete, in the same
+    transaction. Returns the keys of objects owned by single documents,
+    which the caller removes from storage after committing.
+    """
+
+    matching = select(Document.file_key).where(*criteria)
+    references = (
+        select(func.count())
+        .where(Document.file_key == StoredObject.file_key, *criteria)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(StoredObject)
+        .where(StoredObject.file_key.in_(matching))
+        .values(
+            ref_count=StoredObject.ref_count - references,
+            released_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    exclusive = await session.scalars(
+        matching.where(Document.file_key.not_like(f"{BLOB_PREFIX}%")).distinct()
+    )
+    return list(exclusive)
+
+
+async def purge_unreferenced_objects(
+    session: AsyncSession, storage: StorageBackend, grace: timedelta = timedelta(hours=1)
+) -> int:
+    """Delete objects whose last reference was released more than ``grace`` ago.
+
+    The grace period covers uploads that saw the object as present and
+    skipped writing it just before its last reference was released.
+    """
+
+    cutoff = datetime.now(timezone.utc) - grace
+    result = await session.scalars(
+        delete(StoredObject)
+        .where(StoredObject.ref_count <= 0, StoredObject.released_at <= cutoff)
+        .returning(StoredObject.file_key)
+    )
+    file_keys = list(result)
+    await session.commit()
+
+    for file_key in file_keys:
+        await storage.remove_object(file_key)
+    return len(file_keys)
+
+
+async def verify_direct_upload(
+    storage: StorageBackend, company_id: int, file_key: str
+) -> ObjectStat:
+    """Check an object uploaded through a presigned URL before registering it.
+
+    Presigned PUTs cannot enforce a size limit or content type, so objects
+    that break either rule are removed here instead.
+    """
+
+    if not file_key.startswith(f"companies/{company_id}/"):
+        raise UploadRejected(status.HTTP_400_BAD_REQUEST, "Clave de archivo inválida")
+
+    stat = await storage.stat_object(file_key)
+    if stat is None:
+        raise UploadRejected(status.HTTP_400_BAD_REQUEST, "El archivo no ha sido subido")
+    if stat.size > settings.max_upload_size_bytes:
+        await storage.remove_object(file_key)
+        raise _too_large()
+    try:
+        ensure_allowed_content_type(stat.content_type)
+    except UploadRejected:
+        await storage.remove_object(file_key)
+        raise
+    return stat
+
+
+__all__ = [
+    "ALLOWED_CONTENT_TYPES",
+    "BLOB_PREFIX",
+    "HashedUpload",
+    "UploadRejected",
+    "acquire_blobs",
+    "blob_key",
+    "build_object_name",
+    "ensure_allowed_content_type",
+    "hash_upload",
+    "purge_unreferenced_objects",
+    "release_documents",
+    "release_object",
+    "reserve_blobs",
+    "store_blob",
+    "store_upload",
+    "stored_hashes",
+    "verify_direct_upload",
+]
@@ -2,11 +2,39 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Select,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.models.db import Document, Expiration
+from app.core.config import settings
+from app.models.db import (
+    Alert,
+    Company,
+    CompanyStats,
+    Document,
+    Expiration,
+    JobCheckpoint,
+    UTCDateTime,
+    Worker,
+)
+
+CHECKPOINT_NAME = "verify_expirations"
+# Re-examine a short window before the previous run so documents committed
+# while that run was in progress are not lost between watermarks.
+WATERMARK_OVERLAP = timedelta(minutes=5)
 
 
 class ExpirationStatus:
@@ -15,66 +43,377 @@ class ExpirationStatus:
     VENCIDO = "vencido"
 
 
-def _determine_status(expires_at: datetime, now: datetime, warning_threshold: datetime) -> str:
-    if expires_at < now:
-        return ExpirationStatus.VENCIDO
-    if expires_at <= warning_threshold:
-        return ExpirationStatus.POR_VENCER
-    return ExpirationStatus.VIGENTE
+def reminder_days(warning_days: int | None = None) -> list[int]:
+    """Reminder stages in days before expiry, least urgent first.
+
+    ``warning_days`` is the first stage: documents are not reminded about
+    while still vigente, so it overrides any larger ``alert_reminder_days``
+    entry. The configured stages below it follow.
+    """
+
+    days = set(settings.alert_reminder_days)
+    if warning_days is not None:
+        days = {warning_days, *(day for day in days if day < warning_days)}
+    return sorted(days, reverse=True)
+
+
+def reached_reminder_stage(
+    expires_at: datetime, now: datetime, warning_days: int | None = None
+) -> int | None:
+    """Most urgent reminder stage whose time has come, if any."""
+
+    reached = [
+        days for days in reminder_days(warning_days) if expires_at - timedelta(days=days) <= now
+    ]
+    return min(reached) if reached else None
+
+
+def next_reminder_at(
+    expires_at: datetime, stage: int | None, warning_days: int | None = None
+) -> datetime | None:
+    """When the first stage more urgent than ``stage`` falls due."""
 
+    remaining = [days for days in reminder_days(warning_days) if stage is None or days < stage]
+    if not remaining:
+        return None
+    return expires_at - timedelta(days=max(remaining))
 
-async def verify_expirations(session: AsyncSession, warning_days: int = 30) -> dict[str, int]:
+
+def _stage_case(expires_at, now: datetime, warning_days: int):
+    return case(
+        *[
+            (expires_at <= now + timedelta(days=days), days)
+            for days in sorted(reminder_days(warning_days))
+        ],
+        else_=null(),
+    )
+
+
+def _status_case(expires_at, now: datetime, warning_threshold: datetime):
+    return case(
+        (expires_at < now, ExpirationStatus.VENCIDO),
+        (expires_at <= warning_threshold, ExpirationStatus.POR_VENCER),
+        else_=ExpirationStatus.VIGENTE,
+    )
+
+
+class _Scope:
+    """Rows a run has to look at.
+
+    A status only changes when ``now`` crosses ``expires_at - warning_days``
+    or ``expires_at``, so an incremental run only needs expirations whose
+    boundaries fall since the previous run, plus documents edited since then.
+    A full run (``since is None``) covers everything.
+    """
+
+    def __init__(
+        self, since: datetime | None, now: datetime, warning_days: int, warning_threshold: datetime
+    ) -> None:
+        self.since = since
+        self.now = now
+        self.warning_days = warning_days
+        self.warning_threshold = warning_threshold
+
+    def crossing(self, expires_at):
+        if self.since is None:
+            return true()
+        return or_(
+            expires_at.between(self.since, self.now),
+            expires_at.between(
+                self.since + timedelta(days=self.warning_days), self.warning_threshold
+            ),
+        )
+
+    def changed_documents(self):
+        if self.since is None:
+            return true()
+        return Document.updated_at >= self.since
+
+    def documents(self):
+        if self.since is None:
+            return true()
+        return or_(self.crossing(Document.expires_at), self.changed_documents())
+
+
+def _reschedule(new_expires_at, now: datetime) -> dict:
+    # A new expiry date starts a fresh reminder cycle, due for evaluation now.
+    moved = Expiration.expires_at != new_expires_at
+    return {
+        "next_alert_at": case((moved, literal(now, UTCDateTime)), else_=Expiration.next_alert_at),
+        "alert_stage": case((moved, null()), else_=Expiration.alert_stage),
+        "alert_cycle": case((moved, Expiration.alert_cycle + 1), else_=Expiration.alert_cycle),
+    }
+
+
+def _update_existing(dialect_name: str, scope: _Scope):
+    now, warning_threshold = scope.now, scope.warning_threshold
+    if dialect_name == "postgresql":
+        # UPDATE ... FROM lets the planner hash-join documents once instead of
+        # evaluating a correlated subquery per expiration row.
+        new_status = _status_case(Document.expires_at, now, warning_threshold)
+        return (
+            update(Expiration)
+            .where(
+                Expiration.document_id == Document.id,
+                Document.expires_at.is_not(None),
+                or_(scope.crossing(Expiration.expires_at), scope.changed_documents()),
+                or_(
+                    Expiration.expires_at != Document.expires_at,
+                    Expiration.status != new_status,
+                ),
+            )
+            .values(
+                expires_at=Document.expires_at,
+                status=new_status,
+                **_reschedule(Document.expires_at, now),
+            )
+        )
+
+    document_expires_at = (
+        select(Document.expires_at)
+        .where(Document.id == Expiration.document_id)
+        .scalar_subquery()
+    )
+    new_status = _status_case(document_expires_at, now, warning_threshold)
+    return (
+        update(Expiration)
+        .where(
+            document_expires_at.is_not(None),
+            or_(
+                scope.crossing(Expiration.expires_at),
+                Expiration.document_id.in_(select(Document.id).where(scope.changed_documents())),
+            ),
+            or_(
+                Expiration.expires_at != document_expires_at,
+                Expiration.status != new_status,
+            ),
+        )
+        .values(
+            expires_at=document_expires_at,
+            status=new_status,
+            **_reschedule(document_expires_at, now),
+        )
+    )
+
+
+def _insert_missing(scope: _Scope):
+    # Documents only lack an expiration after being created or edited, so the
+    # changed-documents filter is enough to find them incrementally.
+    missing = select(
+        Document.id,
+        Document.expires_at,
+        _status_case(Document.expires_at, scope.now, scope.warning_threshold),
+        literal(scope.now, UTCDateTime),
+    ).where(
+        Document.expires_at.is_not(None),
+        scope.changed_documents(),
+        ~exists().where(Expiration.document_id == Document.id),
+    )
+    return insert(Expiration).from_select(
+        ["document_id", "expires_at", "status", "next_alert_at"], missing
+    )
+
+
+def _schedule_unscheduled(now: datetime, warning_days: int):
+    # Rows from before reminder schedules (or inserted directly) have neither
+    # column set. Those already alerted record the stage they have reached so
+    # it is not sent again. ix_expirations_unscheduled covers exactly these
+    # rows, so finished schedules (also next_alert_at NULL) are never read.
+    already_alerted = exists().where(Alert.expiration_id == Expiration.id)
+    return (
+        update(Expiration)
+        .where(Expiration.next_alert_at.is_(None), Expiration.alert_stage.is_(None))
+        .values(
+            next_alert_at=now,
+            alert_stage=case(
+                (already_alerted, _stage_case(Expiration.expires_at, now, warning_days)),
+                else_=null(),
+            ),
+        )
+    )
+
+
+def _count_status(status: str):
+    return func.coalesce(func.sum(case((Expiration.status == status, 1), else_=0)), 0)
+
+
+_STATS_COLUMNS = ("vigentes", "por_vencer", "vencidos", "workers", "documents", "refreshed_at")
+
+
+async def refresh_company_stats(
+    session: AsyncSession, now: datetime, companies: Select | None = None
+) -> int:
+    """Recompute ``company_stats`` rows, in the caller's transaction.
+
+    ``companies`` selects the company ids to refresh; by default every
+    company is. Returns the number of rows written. Rows are upserted, so
+    concurrent refreshes of the same company never conflict, and readers
+    keep seeing the previous values until the transaction commits.
+    """
+
+    def selected(company_id):
+        return true() if companies is None else company_id.in_(companies)
+
+    documents = (
+        select(
+            Document.company_id.label("company_id"),
+            func.count(Document.id).label("documents"),
+            _count_status(ExpirationStatus.VIGENTE).label("vigentes"),
+            _count_status(ExpirationStatus.POR_VENCER).label("por_vencer"),
+            _count_status(ExpirationStatus.VENCIDO).label("vencidos"),
+        )
+        .outerjoin(Expiration, Expiration.document_id == Document.id)
+        .where(selected(Document.company_id))
+        .group_by(Document.company_id)
+        .subquery()
+    )
+    workers = (
+        select(Worker.company_id.label("company_id"), func.count(Worker.id).label("workers"))
+        .where(selected(Worker.company_id))
+        .group_by(Worker.company_id)
+        .subquery()
+    )
+    rows = (
+        select(
+            Company.id,
+            func.coalesce(documents.c.vigentes, 0),
+            func.coalesce(documents.c.por_vencer, 0),
+            func.coalesce(documents.c.vencidos, 0),
+            func.coalesce(workers.c.workers, 0),
+            func.coalesce(documents.c.documents, 0),
+            literal(now, UTCDateTime),
+        )
+        .outerjoin(documents, documents.c.company_id == Company.id)
+        .outerjoin(workers, workers.c.company_id == Company.id)
+        # Also keeps SQLite from parsing ON CONFLICT as part of the join.
+        .where(selected(Company.id))
+    )
+
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        session.bind.dialect.name
+    )
+    if dialect_insert is None:
+        await session.execute(delete(CompanyStats).where(selected(CompanyStats.company_id)))
+        result = await session.execute(
+            insert(CompanyStats).from_select(["company_id", *_STATS_COLUMNS], rows)
+        )
+        return result.rowcount
+
+    statement = dialect_insert(CompanyStats).from_select(["company_id", *_STATS_COLUMNS], rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CompanyStats.company_id],
+        set_={column: statement.excluded[column] for column in _STATS_COLUMNS},
+    )
+    result = await session.execute(statement)
+    return result.rowcount
+
+
+async def _lock_verification(session: AsyncSession) -> None:
+    # The verify and alert jobs, and the manual endpoints, may all verify at
+    # once. A transaction-scoped advisory lock makes later runs wait and
+    # then see the earlier run's checkpoint and rows. Other databases
+    # serialize writers anyway.
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(
+            select(func.pg_advisory_xact_lock(settings.verify_expirations_lock_key))
+        )
+
+
+def _expire_loaded_expirations(session: AsyncSession) -> None:
+    # The bulk statements bypass the unit of work, so any Expiration already in
+    # the identity map would keep serving stale values to the caller.
+    for instance in list(session.identity_map.values()):
+        if isinstance(instance, Expiration):
+            session.expire(instance)
+
+
+async def verify_expirations(
+    session: AsyncSession,
+    warning_days: int = 30,
+    *,
+    now: datetime | None = None,
+    full: bool = False,
+) -> dict[str, int]:
     """Sync expiration statuses for documents.
 
-    This function is intended to be executed by a scheduled job (e.g., daily)
+    This function is executed by the ``verify_expirations`` scheduler job
     to ensure that every document with an expiration date has an associated
     Expiration row and that its status is updated according to the current
-    date.
+    date. The work is done with a few set-based statements so the run does
+    not load documents into the session.
+
+    Each run stores a watermark in ``job_checkpoints``; later runs with the
+    same ``warning_days`` only touch rows that may have changed since then.
+    Pass ``full=True`` to rescan every document. Concurrent runs are
+    serialized on PostgreSQL by an advisory lock held until commit.
     """
 
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     warning_threshold = now + timedelta(days=warning_days)
-    summary = {"processed": 0, "created": 0, "updated": 0}
+    dialect_name = session.bind.dialect.name
+    parameters = f"warning_days={warning_days}"
+
+    await _lock_verification(session)
+    # populate_existing: a checkpoint loaded before the lock was granted may
+    # predate the run that just released it.
+    checkpoint = await session.get(JobCheckpoint, CHECKPOINT_NAME, populate_existing=True)
+    since = None
+    if (
+        not full
+        and checkpoint is not None
+        and checkpoint.parameters == parameters
+        and checkpoint.last_run_at <= now
+    ):
+        since = checkpoint.last_run_at - WATERMARK_OVERLAP
+    scope = _Scope(since, now, warning_days, warning_threshold)
 
-    result = await session.scalars(
-        select(Document)
-        .where(Document.expires_at.is_not(None))
-        .options(selectinload(Document.expiration))
+    processed = await session.scalar(
+        select(func.count())
+        .select_from(Document)
+        .where(Document.expires_at.is_not(None), scope.documents())
     )
-    documents = result.all()
-
-    for document in documents:
-        expires_at = document.expires_at
-        if expires_at is None:
-            continue
-
-        status = _determine_status(expires_at, now, warning_threshold)
-        expiration = document.expiration
-
-        if expiration is None:
-            session.add(
-                Expiration(
-                    document_id=document.id,
-                    expires_at=expires_at,
-                    status=status,
-                )
-            )
-            summary["created"] += 1
-        else:
-            changes = False
-            if expiration.expires_at != expires_at:
-                expiration.expires_at = expires_at
-                changes = True
-            if expiration.status != status:
-                expiration.status = status
-                changes = True
-            if changes:
-                summary["updated"] += 1
-
-        summary["processed"] += 1
+    # Existing rows are synced before inserting the missing ones so freshly
+    # created expirations are not counted as updates.
+    updated = await session.execute(
+        _update_existing(dialect_name, scope),
+        execution_options={"synchronize_session": False},
+    )
+    created = await session.execute(_insert_missing(scope))
+    await session.execute(
+        _schedule_unscheduled(now, warning_days),
+        execution_options={"synchronize_session": False},
+    )
+
+    # Only companies with documents in this run's scope can have changed
+    # counts; the scheduled refresh_company_stats job catches up the rest
+    # (new workers, deleted documents).
+    changed_companies = None
+    if since is not None:
+        changed_companies = select(Document.company_id).where(scope.documents())
+    await refresh_company_stats(session, now, changed_companies)
+
+    if checkpoint is None:
+        session.add(JobCheckpoint(name=CHECKPOINT_NAME, last_run_at=now, parameters=parameters))
+    else:
+        checkpoint.last_run_at = now
+        checkpoint.parameters = parameters
 
     await session.commit()
-    return summary
+    _expire_loaded_expirations(session)
+
+    return {
+        "processed": processed or 0,
+        "created": created.rowcount,
+        "updated": updated.rowcount,
+    }
 
 
-__all__ = ["ExpirationStatus", "verify_expirations"]
+__all__ = [
+    "CHECKPOINT_NAME",
+    "ExpirationStatus",
+    "next_reminder_at",
+    "reached_reminder_stage",
+    "refresh_company_stats",
+    "reminder_days",
+    "verify_expirations",
+]
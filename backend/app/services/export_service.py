@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.db import Company, Document, Expiration, Worker
+
+EXPORT_CHUNK_SIZE = 1000
+
+DOCUMENT_EXPORT_COLUMNS = [
+    "document_id",
+    "title",
+    "file_key",
+    "expires_at",
+    "company_id",
+    "company_name",
+    "company_tax_id",
+    "worker_id",
+    "worker_first_name",
+    "worker_last_name",
+    "worker_email",
+    "expiration_status",
+    "expiration_expires_at",
+]
+
+
+def document_export_statement(company_id: int | None = None, status: str | None = None) -> Select:
+    statement = (
+        select(
+            Document.id.label("document_id"),
+            Document.title,
+            Document.file_key,
+            Document.expires_at,
+            Company.id.label("company_id"),
+            Company.name.label("company_name"),
+            Company.tax_id.label("company_tax_id"),
+            Worker.id.label("worker_id"),
+            Worker.first_name.label("worker_first_name"),
+            Worker.last_name.label("worker_last_name"),
+            Worker.email.label("worker_email"),
+            Expiration.status.label("expiration_status"),
+            Expiration.expires_at.label("expiration_expires_at"),
+        )
+        .join(Company, Company.id == Document.company_id)
+        .outerjoin(Worker, Worker.id == Document.worker_id)
+        .outerjoin(Expiration, Expiration.document_id == Document.id)
+        .order_by(Document.id)
+    )
+    if company_id is not None:
+        statement = statement.where(Document.company_id == company_id)
+    if status is not None:
+        statement = statement.where(Expiration.status == status)
+    return statement
+
+
+async def stream_rows(
+    session_factory: async_sessionmaker[AsyncSession], statement: Select
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield result rows through a server-side cursor, one chunk at a time."""
+
+    async with session_factory() as session:
+        result = await session.stream(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for row in result.mappings():
+            yield dict(row)
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def to_ndjson(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps({key: _serialize(value) for key, value in row.items()}) + "\n"
+
+
+async def to_csv(rows: AsyncIterator[dict[str, Any]], columns: list[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow({key: _serialize(value) for key, value in row.items()})
+        yield buffer.getvalue()
+
+
+__all__ = [
+    "DOCUMENT_EXPORT_COLUMNS",
+    "EXPORT_CHUNK_SIZE",
+    "document_export_statement",
+    "stream_rows",
+    "to_csv",
+    "to_ndjson",
+]
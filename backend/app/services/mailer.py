@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.metrics import smtp_send_duration
+
+# Errors after which a pooled connection is discarded and the send retried once
+# on a fresh one; servers commonly drop idle connections without notice.
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+def build_email(recipient: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = settings.smtp_from
+    message["To"] = recipient
+    message.set_content(body)
+    return message
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP) -> None:
+        self.server = server
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPMailer:
+    """Sends email over a small pool of persistent SMTP connections.
+
+    Each connection performs STARTTLS and login once and is then reused for
+    many messages. ``size`` bounds both the number of open connections and
+    the number of messages in flight.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        size: int = 4,
+        timeout: float = 30.0,
+        max_idle_seconds: float = 60.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self._idle: list[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    def _connect(self) -> _PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except BaseException:
+            server.close()
+            raise
+        return _PooledConnection(server)
+
+    def _checkout(self) -> _PooledConnection | None:
+        with self._lock:
+            while self._idle:
+                connection = self._idle.pop()
+                if time.monotonic() - connection.last_used < self.max_idle_seconds:
+                    return connection
+                connection.close()
+        return None
+
+    def _checkin(self, connection: _PooledConnection) -> None:
+        connection.last_used = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _send_blocking(self, message: EmailMessage) -> None:
+        connection = self._checkout()
+        if connection is not None:
+            try:
+                connection.server.send_message(message)
+            except _CONNECTION_ERRORS:
+                connection.server.close()
+            except BaseException:
+                connection.server.close()
+                raise
+            else:
+                self._checkin(connection)
+                return
+
+        connection = self._connect()
+        try:
+            connection.server.send_message(message)
+        except BaseException:
+            connection.server.close()
+            raise
+        self._checkin(connection)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.size)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        message = build_email(recipient, subject, body)
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                await loop.run_in_executor(self._executor, self._send_blocking, message)
+                outcome = "ok"
+            finally:
+                smtp_send_duration.observe(time.perf_counter() - started, outcome=outcome)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+        self._executor.shutdown(wait=False)
+
+
+@lru_cache
+def get_mailer() -> SMTPMailer:
+    return SMTPMailer(
+        settings.smtp_host,
+        settings.smtp_port,
+        username=settings.smtp_username,
+        password=settings.smtp_password,
+        use_tls=settings.smtp_use_tls,
+        size=settings.smtp_pool_size,
+        timeout=settings.smtp_timeout,
+        max_idle_seconds=settings.smtp_max_idle_seconds,
+    )
+
+
+def close_mailer() -> None:
+    if get_mailer.cache_info().currsize:
+        get_mailer().close()
+        get_mailer.cache_clear()
+
+
+__all__ = ["SMTPMailer", "build_email", "close_mailer", "get_mailer"]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import (
+    ROLE_ADMIN,
+    create_access_token,
+    hash_password,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
+from app.models.db import User
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def _dummy_hash() -> str:
+    return hash_password("dummy-password")
+
+
+async def authenticate(session: AsyncSession, email: str, password: str) -> User | None:
+    """Return the active user matching ``email`` and ``password``.
+
+    Unknown emails are checked against a dummy hash so response time does
+    not reveal which accounts exist. Hashes made with outdated parameters
+    are upgraded on a successful login.
+    """
+
+    user = await session.scalar(select(User).where(User.email == email.lower()))
+    if user is None or not user.is_active:
+        await verify_password_async(password, _dummy_hash())
+        return None
+    if not await verify_password_async(password, user.password_hash):
+        return None
+
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(password)
+        await session.commit()
+    return user
+
+
+def issue_token(user: User) -> str:
+    return create_access_token(
+        subject=user.email,
+        additional_claims={
+            "name": user.full_name,
+            "uid": user.id,
+            "role": user.role,
+            "company_id": user.company_id,
+        },
+    )
+
+
+async def create_user(
+    session: AsyncSession,
+    *,
+    email: str,
+    password: str,
+    full_name: str,
+    role: str,
+    company_id: int | None = None,
+) -> User:
+    user = User(
+        email=email.lower(),
+        full_name=full_name,
+        password_hash=await hash_password_async(password),
+        role=role,
+        company_id=company_id,
+    )
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def ensure_admin_user(session: AsyncSession) -> User | None:
+    """Create the admin from ``ADMIN_*`` settings when no users exist yet.
+
+    This only bootstraps an empty table; later changes to the settings do
+    not touch existing accounts.
+    """
+
+    if await session.scalar(select(func.count()).select_from(User)):
+        return None
+    logger.info("Creating initial admin user %s", settings.admin_email)
+    return await create_user(
+        session,
+        email=settings.admin_email,
+        password=settings.admin_password,
+        full_name=settings.admin_full_name,
+        role=ROLE_ADMIN,
+    )
+
+
+__all__ = ["authenticate", "create_user", "ensure_admin_user", "issue_token"]
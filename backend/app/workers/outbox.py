@@ -0,0 +1,55 @@
+"""Outbox worker: delivers queued alert emails.
+
+Run with ``python -m app.workers.outbox``. Several workers may run at once;
+each claims its own batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.alert_service import deliver_outbox
+from app.services.mailer import close_mailer
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(stop: asyncio.Event | None = None) -> None:
+    stop = stop or asyncio.Event()
+    while not stop.is_set():
+        try:
+            async with SessionLocal() as session:
+                summary = await deliver_outbox(session)
+        except Exception:
+            logger.exception("Outbox delivery failed")
+            summary = {"claimed": 0}
+
+        if summary["claimed"]:
+            logger.info("Outbox batch delivered: %s", summary)
+            # Keep draining while there is work; failed messages are
+            # already pushed back by their retry delay.
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.outbox_poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_mailer()
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["main", "run_worker"]
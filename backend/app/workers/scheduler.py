@@ -0,0 +1,99 @@
+"""Periodic expiration and alert jobs.
+
+Started from the API lifespan when ``SCHEDULER_ENABLED`` is set, or as a
+standalone process with ``python -m app.workers.scheduler``. Either way only
+the replica holding the advisory lock runs the jobs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.scheduler import LeaderLock, Scheduler
+from app.core.storage import get_storage
+from app.services.alert_service import enqueue_document_alerts
+from app.services.document_service import purge_unreferenced_objects
+from app.services.expiration_service import refresh_company_stats, verify_expirations
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_expirations_job(session: AsyncSession) -> dict[str, int]:
+    return await verify_expirations(session, warning_days=settings.scheduler_warning_days)
+
+
+async def enqueue_alerts_job(session: AsyncSession) -> dict[str, int]:
+    # Delivery is left to the outbox worker.
+    return await enqueue_document_alerts(session, warning_days=settings.scheduler_warning_days)
+
+
+async def refresh_stats_job(session: AsyncSession) -> dict[str, int]:
+    # Verification only refreshes companies whose documents changed; this
+    # catches up worker counts and deletions.
+    refreshed = await refresh_company_stats(session, datetime.now(timezone.utc))
+    await session.commit()
+    return {"companies_refreshed": refreshed}
+
+
+async def purge_objects_job(session: AsyncSession) -> dict[str, int]:
+    grace = timedelta(seconds=settings.storage_purge_grace_seconds)
+    purged = await purge_unreferenced_objects(session, get_storage(), grace=grace)
+    return {"objects_purged": purged}
+
+
+def build_scheduler() -> Scheduler:
+    scheduler = Scheduler(SessionLocal, LeaderLock(engine, settings.scheduler_lock_key))
+    scheduler.add_job(
+        "verify_expirations", settings.scheduler_verify_interval_seconds, verify_expirations_job
+    )
+    scheduler.add_job(
+        "enqueue_alerts", settings.scheduler_alert_interval_seconds, enqueue_alerts_job
+    )
+    scheduler.add_job(
+        "refresh_company_stats", settings.scheduler_stats_interval_seconds, refresh_stats_job
+    )
+    scheduler.add_job(
+        "purge_objects", settings.scheduler_purge_interval_seconds, purge_objects_job
+    )
+    return scheduler
+
+
+@lru_cache
+def get_scheduler() -> Scheduler:
+    return build_scheduler()
+
+
+async def _run() -> None:
+    scheduler = get_scheduler()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, scheduler.request_stop)
+    await scheduler.run_forever()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = [
+    "build_scheduler",
+    "enqueue_alerts_job",
+    "get_scheduler",
+    "main",
+    "purge_objects_job",
+    "refresh_stats_job",
+    "verify_expirations_job",
+]
@@ -0,0 +1,5 @@
+"""Benchmarks for the API and background jobs.
+
+Each benchmark writes a JSON result file; compare two of them with
+``python -m benchmarks.compare``.
+"""
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import math
+import platform
+import statistics
+import subprocess
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import engine_options
+from app.models.db import Base
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(samples: Sequence[float]) -> dict[str, float]:
+    """Latency summary in milliseconds for ``samples`` given in seconds."""
+
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(
+    name: str, parameters: dict[str, Any], results: dict[str, Any], output: str | None = None
+) -> Path:
+    """Write a result document and return its path.
+
+    Results of the same benchmark are only comparable when ``parameters``
+    match; :mod:`benchmarks.compare` refuses to compare them otherwise.
+    """
+
+    document = {
+        "benchmark": name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = RESULTS_DIR / f"{name}-{stamp}.json"
+    else:
+        path = Path(output)
+    path.write_text(json.dumps(document, indent=2, default=str) + "\n")
+    return path
+
+
+async def create_engine(database_url: str, reset: bool = True) -> AsyncEngine:
+    """Engine for a benchmark database, with the schema created from scratch.
+
+    Never point this at a database you care about: ``reset`` drops every
+    table first.
+    """
+
+    if database_url.startswith("sqlite") and ":memory:" in database_url:
+        engine = create_async_engine(
+            database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = create_async_engine(database_url, **engine_options(database_url))
+    async with engine.begin() as connection:
+        if reset:
+            await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    return engine
+
+
+__all__ = [
+    "DEFAULT_DATABASE_URL",
+    "RESULTS_DIR",
+    "create_engine",
+    "percentile",
+    "summarize",
+    "write_results",
+]
@@ -0,0 +1,89 @@
+"""Compare two benchmark result files and fail on regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.2
+
+Exits with status 1 when any compared percentile of the candidate is slower
+than the baseline by more than ``threshold`` (and by more than
+``--min-delta-ms``, so sub-millisecond noise never fails a run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+COMPARED_FIELDS = ("p50_ms", "p95_ms")
+
+
+@dataclass(frozen=True)
+class Change:
+    name: str
+    field: str
+    baseline: float
+    candidate: float
+
+    @property
+    def ratio(self) -> float:
+        return self.candidate / self.baseline if self.baseline else float("inf")
+
+    def regressed(self, threshold: float, min_delta_ms: float) -> bool:
+        return (
+            self.candidate - self.baseline > min_delta_ms
+            and self.ratio > 1 + threshold
+        )
+
+
+def load(path: str | Path) -> dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare(
+    baseline: dict[str, Any], candidate: dict[str, Any], fields: tuple[str, ...] = COMPARED_FIELDS
+) -> list[Change]:
+    if baseline["benchmark"] != candidate["benchmark"]:
+        raise ValueError(
+            f"Cannot compare {baseline['benchmark']!r} results with {candidate['benchmark']!r}"
+        )
+    changes = []
+    for name, summary in baseline["results"].items():
+        other = candidate["results"].get(name)
+        if other is None:
+            continue
+        for field in fields:
+            if field in summary and field in other:
+                changes.append(Change(name, field, summary[field], other[field]))
+    return changes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline["parameters"] != candidate["parameters"]:
+        print("Warning: the runs used different parameters", file=sys.stderr)
+
+    regressions = 0
+    for change in compare(baseline, candidate):
+        regressed = change.regressed(args.threshold, args.min_delta_ms)
+        regressions += regressed
+        print(
+            f"{'REGRESSION' if regressed else 'ok':10} {change.name:20} {change.field:7}"
+            f" {change.baseline:10.1f} -> {change.candidate:10.1f} ms ({change.ratio:5.2f}x)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["Change", "compare", "load", "main"]
@@ -0,0 +1,169 @@
+"""Synthetic data for benchmarks.
+
+Expiry dates follow a rough production shape: most documents are valid for
+months, a slice is about to expire, some are already expired and a few never
+expire.
+
+Seed a database (appending to existing data) with::
+
+    python -m benchmarks.datagen --database-url postgresql+asyncpg://... --companies 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.db import Company, Document, Worker
+from benchmarks.common import create_engine
+
+INSERT_CHUNK_SIZE = 1000
+
+# (weight, min days from now, max days from now); None means no expiry.
+EXPIRY_DISTRIBUTION: list[tuple[float, tuple[int, int] | None]] = [
+    (0.10, (-365, -1)),
+    (0.15, (0, 30)),
+    (0.70, (31, 730)),
+    (0.05, None),
+]
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    companies: int = 100
+    workers_per_company: int = 20
+    documents_per_worker: int = 5
+
+    @property
+    def workers(self) -> int:
+        return self.companies * self.workers_per_company
+
+    @property
+    def documents(self) -> int:
+        return self.workers * self.documents_per_worker
+
+    def as_dict(self) -> dict[str, int]:
+        return {**asdict(self), "workers": self.workers, "documents": self.documents}
+
+
+def random_expiry(rng: random.Random, now: datetime) -> datetime | None:
+    weights = [weight for weight, _ in EXPIRY_DISTRIBUTION]
+    (_, days), = rng.choices(EXPIRY_DISTRIBUTION, weights=weights)
+    if days is None:
+        return None
+    return now + timedelta(days=rng.randint(*days), seconds=rng.randint(0, 86_399))
+
+
+async def _insert(session: AsyncSession, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await session.execute(insert(model), rows[start : start + INSERT_CHUNK_SIZE])
+
+
+async def generate(
+    session: AsyncSession,
+    size: DatasetSize,
+    *,
+    seed: int = 0,
+    now: datetime | None = None,
+) -> DatasetSize:
+    """Insert ``size`` companies, workers and documents and commit.
+
+    The same ``seed`` and ``now`` always produce the same dataset. Documents
+    point at placeholder object keys; nothing is written to storage.
+    """
+
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    offset = await session.scalar(select(Company.id).order_by(Company.id.desc()).limit(1)) or 0
+
+    await _insert(
+        session,
+        Company,
+        [
+            {
+                "name": f"Empresa {offset + index}",
+                "tax_id": f"BENCH-{seed}-{offset + index}",
+                "contact_email": f"empresa{offset + index}@example.com",
+            }
+            for index in range(1, size.companies + 1)
+        ],
+    )
+    company_ids = list(
+        await session.scalars(select(Company.id).where(Company.id > offset).order_by(Company.id))
+    )
+
+    worker_offset = await session.scalar(select(Worker.id).order_by(Worker.id.desc()).limit(1)) or 0
+    await _insert(
+        session,
+        Worker,
+        [
+            {
+                "company_id": company_id,
+                "first_name": f"Trabajador {index}",
+                "last_name": f"Empresa {company_id}",
+                "email": f"w{company_id}-{index}@example.com",
+                "certification_expires_at": random_expiry(rng, now),
+            }
+            for company_id in company_ids
+            for index in range(size.workers_per_company)
+        ],
+    )
+    workers = (
+        await session.execute(
+            select(Worker.id, Worker.company_id).where(Worker.id > worker_offset).order_by(Worker.id)
+        )
+    ).all()
+
+    await _insert(
+        session,
+        Document,
+        [
+            {
+                "company_id": company_id,
+                "worker_id": worker_id,
+                "title": f"Documento {index}",
+                "file_key": f"benchmarks/{worker_id}/{index}.pdf",
+                "expires_at": random_expiry(rng, now),
+            }
+            for worker_id, company_id in workers
+            for index in range(size.documents_per_worker)
+        ],
+    )
+    await session.commit()
+    return size
+
+
+async def _seed(database_url: str, size: DatasetSize, seed: int) -> None:
+    engine = await create_engine(database_url, reset=False)
+    try:
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+            await generate(session, size, seed=seed)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic data.")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--companies", type=int, default=DatasetSize.companies)
+    parser.add_argument("--workers-per-company", type=int, default=DatasetSize.workers_per_company)
+    parser.add_argument("--documents-per-worker", type=int, default=DatasetSize.documents_per_worker)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    size = DatasetSize(args.companies, args.workers_per_company, args.documents_per_worker)
+    asyncio.run(_seed(args.database_url, size, args.seed))
+    print(f"Inserted {size.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["EXPIRY_DISTRIBUTION", "DatasetSize", "generate", "main", "random_expiry"]
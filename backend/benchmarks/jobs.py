@@ -0,0 +1,126 @@
+"""Microbenchmarks for the expiration and alert jobs.
+
+Each repeat builds a fresh dataset, then times a full verification, an
+incremental one with nothing changed, and a complete alert run delivered to
+a stub sender::
+
+    python -m benchmarks.jobs --companies 200 --repeats 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.services.alert_service import send_document_alerts
+from app.services.expiration_service import verify_expirations
+from benchmarks.common import DEFAULT_DATABASE_URL, create_engine, summarize, write_results
+from benchmarks.datagen import DatasetSize, generate
+
+
+class StubSender:
+    """Accepts every email without network I/O, with optional fixed latency."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.sent = 0
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+async def run(
+    size: DatasetSize,
+    *,
+    database_url: str = DEFAULT_DATABASE_URL,
+    repeats: int = 3,
+    warning_days: int = 30,
+    sender_latency: float = 0.0,
+    seed: int = 0,
+) -> dict[str, dict]:
+    timings: dict[str, list[float]] = defaultdict(list)
+    counters: dict[str, dict] = {}
+
+    for repeat in range(repeats):
+        engine = await create_engine(database_url)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        now = datetime.now(timezone.utc)
+        try:
+            async with session_factory() as session:
+                started = time.perf_counter()
+                await generate(session, size, seed=seed + repeat, now=now)
+                timings["generate"].append(time.perf_counter() - started)
+
+            for name, full in (("verify_full", True), ("verify_incremental", False)):
+                async with session_factory() as session:
+                    started = time.perf_counter()
+                    counters[name] = await verify_expirations(
+                        session, warning_days, now=now, full=full
+                    )
+                    timings[name].append(time.perf_counter() - started)
+
+            sender = StubSender(sender_latency)
+            async with session_factory() as session:
+                started = time.perf_counter()
+                summary = await send_document_alerts(session, sender.send, warning_days)
+                timings["send_alerts"].append(time.perf_counter() - started)
+            counters["send_alerts"] = {**summary, "emails": sender.sent}
+        finally:
+            await engine.dispose()
+
+    return {
+        name: {**summarize(samples), "last_run": counters.get(name)}
+        for name, samples in timings.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--companies", type=int, default=DatasetSize.companies)
+    parser.add_argument("--workers-per-company", type=int, default=DatasetSize.workers_per_company)
+    parser.add_argument("--documents-per-worker", type=int, default=DatasetSize.documents_per_worker)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warning-days", type=int, default=30)
+    parser.add_argument("--sender-latency", type=float, default=0.0, help="Seconds per stub send")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/jobs-<time>.json)")
+    args = parser.parse_args(argv)
+
+    size = DatasetSize(args.companies, args.workers_per_company, args.documents_per_worker)
+    results = asyncio.run(
+        run(
+            size,
+            database_url=args.database_url,
+            repeats=args.repeats,
+            warning_days=args.warning_days,
+            sender_latency=args.sender_latency,
+            seed=args.seed,
+        )
+    )
+    parameters = {
+        **size.as_dict(),
+        "database": args.database_url.split(":", 1)[0],
+        "repeats": args.repeats,
+        "warning_days": args.warning_days,
+        "sender_latency": args.sender_latency,
+        "seed": args.seed,
+    }
+    path = write_results("jobs", parameters, results, args.output)
+    for name, summary in results.items():
+        print(f"{name:20} p50={summary['p50_ms']:9.1f} ms  max={summary['max_ms']:9.1f} ms")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["StubSender", "main", "run"]
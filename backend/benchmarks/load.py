@@ -0,0 +1,282 @@
+"""HTTP load scenario for the list and upload endpoints.
+
+By default the app runs in-process against a generated dataset, so results
+measure the application and database rather than the network. Pass
+``--base-url`` to drive a deployed instance instead::
+
+    python -m benchmarks.load --requests 2000 --concurrency 20
+    python -m benchmarks.load --base-url http://localhost:8000 --duration 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import MemoryBackend, ResponseCache, get_cache
+from app.core.database import (
+    get_read_session,
+    get_read_session_factory,
+    get_session,
+    get_session_factory,
+)
+from app.core.security import ROLE_ADMIN, create_access_token
+from app.core.storage import LocalStorage, get_storage
+from app.main import app
+from benchmarks.common import create_engine, summarize, write_results
+from benchmarks.datagen import DatasetSize, generate
+
+UPLOAD_SIZE = 64 * 1024
+
+
+@dataclass
+class Context:
+    client: AsyncClient
+    company_ids: list[int]
+    rng: random.Random
+
+
+Scenario = Callable[[Context], Awaitable[Response]]
+
+
+async def list_companies(context: Context) -> Response:
+    return await context.client.get("/companies/", params={"limit": 50})
+
+
+async def list_workers(context: Context) -> Response:
+    company_id = context.rng.choice(context.company_ids)
+    return await context.client.get("/workers/", params={"company_id": company_id, "limit": 50})
+
+
+async def list_documents(context: Context) -> Response:
+    company_id = context.rng.choice(context.company_ids)
+    return await context.client.get("/documentos/", params={"company_id": company_id, "limit": 50})
+
+
+async def upload_document(context: Context) -> Response:
+    # Random bytes so content addressing cannot skip the storage write.
+    content = b"%PDF-1.4\n" + context.rng.randbytes(UPLOAD_SIZE)
+    return await context.client.post(
+        "/documentos/",
+        data={"company_id": str(context.rng.choice(context.company_ids)), "title": "Carga"},
+        files={"file": ("carga.pdf", content, "application/pdf")},
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "list_companies": list_companies,
+    "list_workers": list_workers,
+    "list_documents": list_documents,
+    "upload_document": upload_document,
+}
+DEFAULT_MIX = {"list_companies": 1, "list_workers": 2, "list_documents": 6, "upload_document": 1}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse ``name=weight,name=weight`` into scenario weights."""
+
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@asynccontextmanager
+async def in_process_client(
+    size: DatasetSize,
+    database_url: str | None,
+    use_cache: bool,
+    seed: int,
+    headers: dict[str, str],
+) -> AsyncIterator[AsyncClient]:
+    with tempfile.TemporaryDirectory() as root:
+        # Concurrent requests need real connections, which an in-memory
+        # SQLite database cannot share, so the default is a scratch file.
+        database_url = database_url or f"sqlite+aiosqlite:///{os.path.join(root, 'benchmark.db')}"
+        engine = await create_engine(database_url)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with session_factory() as session:
+            await generate(session, size, seed=seed)
+
+        async def override_get_session():
+            async with session_factory() as session:
+                yield session
+
+        storage = LocalStorage(os.path.join(root, "objects"))
+        # A zero TTL expires every entry on write, which disables the cache.
+        cache = ResponseCache(MemoryBackend(), ttl=60 if use_cache else 0)
+        overrides = {
+            get_session: override_get_session,
+            get_read_session: override_get_session,
+            get_session_factory: lambda: session_factory,
+            get_read_session_factory: lambda: session_factory,
+            get_storage: lambda: storage,
+            get_cache: lambda: cache,
+        }
+        app.dependency_overrides.update(overrides)
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://benchmark", headers=headers
+            ) as client:
+                yield client
+        finally:
+            for dependency in overrides:
+                app.dependency_overrides.pop(dependency, None)
+            storage.close()
+            await engine.dispose()
+
+
+async def _company_ids(client: AsyncClient) -> list[int]:
+    response = await client.get("/companies/", params={"limit": 1000})
+    response.raise_for_status()
+    company_ids = [company["id"] for company in response.json()]
+    if not company_ids:
+        raise SystemExit("The target has no companies; seed it with benchmarks.datagen first")
+    return company_ids
+
+
+async def drive(
+    client: AsyncClient,
+    mix: dict[str, float],
+    *,
+    concurrency: int,
+    requests: int | None,
+    duration: float | None,
+    seed: int,
+) -> dict[str, dict]:
+    """Issue requests from ``concurrency`` tasks and summarize them per scenario.
+
+    Stops after ``requests`` requests or ``duration`` seconds, whichever
+    comes first.
+    """
+
+    context = Context(client, await _company_ids(client), random.Random(seed))
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def user() -> None:
+        nonlocal issued
+        while (requests is None or issued < requests) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            issued += 1
+            name = context.rng.choices(names, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](context)
+                outcome = str(response.status_code)
+            except Exception as error:
+                outcome = type(error).__name__
+            latencies[name].append(time.perf_counter() - started)
+            statuses[name][outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {
+        name: {**summarize(samples), "statuses": dict(statuses[name])}
+        for name, samples in latencies.items()
+    }
+    total = sum(len(samples) for samples in latencies.values())
+    errors = sum(
+        count
+        for counter in statuses.values()
+        for outcome, count in counter.items()
+        if not outcome.startswith(("2", "3"))
+    )
+    results["total"] = {
+        **summarize([sample for samples in latencies.values() for sample in samples]),
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "errors": errors,
+    }
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict]:
+    options = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration": args.duration,
+        "seed": args.seed,
+    }
+    # Without --token, sign one with the local JWT settings, which must match
+    # the target's.
+    headers = {"Authorization": f"Bearer {args.token or create_access_token('benchmark', {'role': ROLE_ADMIN})}"}
+    if args.base_url:
+        async with AsyncClient(base_url=args.base_url, timeout=args.timeout, headers=headers) as client:
+            return await drive(client, args.mix, **options)
+
+    size = DatasetSize(args.companies, args.workers_per_company, args.documents_per_worker)
+    async with in_process_client(size, args.database_url, args.cache, args.seed, headers) as client:
+        return await drive(client, args.mix, **options)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="Database for the in-process app (default: a scratch SQLite file)")
+    parser.add_argument("--companies", type=int, default=DatasetSize.companies)
+    parser.add_argument("--workers-per-company", type=int, default=DatasetSize.workers_per_company)
+    parser.add_argument("--documents-per-worker", type=int, default=DatasetSize.documents_per_worker)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. list_documents=3,upload_document=1")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="Seconds to run; overrides --requests")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--token", help="Access token for --base-url (default: signed locally)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load-<time>.json)")
+    args = parser.parse_args(argv)
+    if args.duration:
+        args.requests = None
+
+    results = asyncio.run(run(args))
+    parameters = {
+        "target": args.base_url or (args.database_url or "sqlite").split(":", 1)[0],
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration": args.duration,
+        "cache": args.cache,
+        "seed": args.seed,
+    }
+    if not args.base_url:
+        parameters.update(
+            DatasetSize(args.companies, args.workers_per_company, args.documents_per_worker).as_dict()
+        )
+    path = write_results("load", parameters, results, args.output)
+    for name, summary in results.items():
+        print(
+            f"{name:16} n={summary['count']:6}  p50={summary['p50_ms']:8.1f} ms"
+            f"  p95={summary['p95_ms']:8.1f} ms  p99={summary['p99_ms']:8.1f} ms"
+        )
+    print(f"{results['total']['throughput_rps']:.1f} req/s, {results['total']['errors']} errors")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["DEFAULT_MIX", "SCENARIOS", "drive", "in_process_client", "main", "parse_mix"]
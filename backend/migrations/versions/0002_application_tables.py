@@ -0,0 +1,147 @@
+"""Tables and columns added since the initial schema.
+
+Users, the email outbox, content-addressed objects, dashboard statistics
+and job checkpoints, plus the new columns on existing tables. Every added
+column is nullable or has a constant-time default, so existing tables are
+not rewritten. Indexes on existing tables are left to 0003, which builds
+them concurrently.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_checkpoints",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("parameters", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+        sa.Column("recipient", sa.String(length=255), nullable=False),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index("ix_outbox_messages_id", "outbox_messages", ["id"])
+    op.create_index(
+        "ix_outbox_messages_status_available_at", "outbox_messages", ["status", "available_at"]
+    )
+
+    op.create_table(
+        "stored_objects",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("file_key", sa.String(length=512), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("released_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("sha256"),
+        sa.UniqueConstraint("file_key"),
+    )
+
+    op.create_table(
+        "company_stats",
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("vigentes", sa.Integer(), nullable=False),
+        sa.Column("por_vencer", sa.Integer(), nullable=False),
+        sa.Column("vencidos", sa.Integer(), nullable=False),
+        sa.Column("workers", sa.Integer(), nullable=False),
+        sa.Column("documents", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("company_id"),
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_company_id", "users", ["company_id"])
+
+    op.add_column("companies", sa.Column("contact_email", sa.String(length=255), nullable=True))
+    updated_at = sa.Column(
+        "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+    )
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite cannot add a column with a non-constant default in place.
+        with op.batch_alter_table("documents", recreate="always") as batch:
+            batch.add_column(updated_at)
+    else:
+        op.add_column("documents", updated_at)
+    # Existing rows start unscheduled; the next verify_expirations run
+    # schedules them, recording the stage of any alert already sent.
+    op.add_column(
+        "expirations", sa.Column("next_alert_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("expirations", sa.Column("alert_stage", sa.Integer(), nullable=True))
+    # Batch mode recreates the table on SQLite, which cannot add a foreign
+    # key in place; elsewhere it issues plain ALTER statements.
+    with op.batch_alter_table("alerts") as batch:
+        batch.add_column(sa.Column("outbox_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "alerts_outbox_id_fkey",
+            "outbox_messages",
+            ["outbox_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("alerts") as batch:
+        batch.drop_constraint("alerts_outbox_id_fkey", type_="foreignkey")
+        batch.drop_column("outbox_id")
+    with op.batch_alter_table("expirations") as batch:
+        batch.drop_column("alert_stage")
+        batch.drop_column("next_alert_at")
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("updated_at")
+    with op.batch_alter_table("companies") as batch:
+        batch.drop_column("contact_email")
+
+    op.drop_table("users")
+    op.drop_table("company_stats")
+    op.drop_table("stored_objects")
+    op.drop_table("outbox_messages")
+    op.drop_table("job_checkpoints")
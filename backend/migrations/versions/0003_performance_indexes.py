@@ -0,0 +1,82 @@
+"""Indexes on existing tables and the one-expiration-per-document constraint.
+
+Indexes are built with ``CREATE INDEX CONCURRENTLY`` on PostgreSQL so the
+tables stay writable while they build; that cannot run inside a
+transaction, hence the autocommit block. ``IF NOT EXISTS`` lets the
+revision resume after an interrupted build. An interrupted concurrent
+build can leave an INVALID index behind; drop it by hand and upgrade
+again.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+_UNSCHEDULED = sa.text("next_alert_at IS NULL AND alert_stage IS NULL")
+
+# (name, table, columns, options)
+_INDEXES = [
+    ("ix_expirations_document_id", "expirations", ["document_id"], {"unique": True}),
+    ("ix_expirations_expires_at", "expirations", ["expires_at"], {}),
+    ("ix_expirations_next_alert_at", "expirations", ["next_alert_at"], {}),
+    ("ix_expirations_status_expires_at", "expirations", ["status", "expires_at"], {}),
+    (
+        "ix_expirations_unscheduled",
+        "expirations",
+        ["id"],
+        {"postgresql_where": _UNSCHEDULED, "sqlite_where": _UNSCHEDULED},
+    ),
+    ("ix_alerts_expiration_id_channel", "alerts", ["expiration_id", "channel"], {}),
+    ("ix_alerts_outbox_id", "alerts", ["outbox_id"], {}),
+    ("ix_documents_expires_at", "documents", ["expires_at"], {}),
+    ("ix_documents_updated_at", "documents", ["updated_at"], {}),
+    ("ix_workers_company_id_id", "workers", ["company_id", "id"], {}),
+    ("ix_documents_company_id_id", "documents", ["company_id", "id"], {}),
+    ("ix_documents_worker_id_id", "documents", ["worker_id", "id"], {}),
+]
+
+# Single-column indexes that development databases built with create_all
+# may still have; the composite ones above cover the same lookups through
+# their leading column.
+_SUPERSEDED = [
+    ("ix_workers_company_id", "workers"),
+    ("ix_documents_company_id", "documents"),
+    ("ix_documents_worker_id", "documents"),
+    ("ix_alerts_expiration_id", "alerts"),
+]
+
+
+def upgrade() -> None:
+    # The unique index cannot build over duplicates; keep the oldest
+    # expiration of each document, which is the one the API has served.
+    op.execute(
+        "DELETE FROM expirations WHERE id NOT IN "
+        "(SELECT MIN(id) FROM expirations GROUP BY document_id)"
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **options,
+            )
+        for name, table in _SUPERSEDED:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
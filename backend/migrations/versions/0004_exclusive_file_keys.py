@@ -0,0 +1,47 @@
+"""Unique file_key for documents that own their object.
+
+Presigned uploads store one object per document, and deleting the document
+deletes the object, so two documents must never share such a key. Blobs
+under ``blobs/`` are content-addressed and shared by design.
+
+Built concurrently like 0003. Existing duplicates make the build fail and
+leave an INVALID index: drop it, resolve the duplicates and upgrade again.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+_EXCLUSIVE = sa.text("file_key NOT LIKE 'blobs/%'")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_documents_file_key_exclusive",
+            "documents",
+            ["file_key"],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=_EXCLUSIVE,
+            sqlite_where=_EXCLUSIVE,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_documents_file_key_exclusive",
+            table_name="documents",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
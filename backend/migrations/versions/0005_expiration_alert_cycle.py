@@ -0,0 +1,30 @@
+"""Reminder cycle counter on expirations.
+
+Part of the outbox idempotency key, so moving a document's expiry date
+away and back starts reminders under new keys. The constant default keeps
+the column addition from rewriting the table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "expirations",
+        sa.Column("alert_cycle", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("expirations") as batch:
+        batch.drop_column("alert_cycle")
@@ -10,7 +10,16 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from app.core.database import get_session
+from app.core.cache import MemoryBackend, ResponseCache, get_cache
+from app.core.database import (
+    get_read_session,
+    get_read_session_factory,
+    get_session,
+    get_session_factory,
+)
+from app.core.rate_limit import RateLimiter, get_login_rate_limiter
+from app.core.security import ROLE_ADMIN, create_access_token
+from app.core.storage import LocalStorage, get_storage
 from app.main import app
 from app.models.db import Base
 
@@ -33,8 +42,12 @@ async def setup_db():
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_read_session_factory] = lambda: TestSessionLocal
     yield
-    app.dependency_overrides.pop(get_session, None)
+    for dependency in (get_session, get_session_factory, get_read_session, get_read_session_factory):
+        app.dependency_overrides.pop(dependency, None)
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     await test_engine.dispose()
@@ -48,9 +61,28 @@ async def clean_tables():
             await conn.execute(table.delete())
 
 
+@pytest.fixture(autouse=True)
+def cache():
+    # Table cleanup reuses ids, so every test starts with an empty cache.
+    response_cache = ResponseCache(MemoryBackend(), ttl=60)
+    app.dependency_overrides[get_cache] = lambda: response_cache
+    yield response_cache
+    app.dependency_overrides.pop(get_cache, None)
+
+
+@pytest.fixture(autouse=True)
+def login_rate_limiter():
+    limiter = RateLimiter(attempts=5, window=60)
+    app.dependency_overrides[get_login_rate_limiter] = lambda: limiter
+    yield limiter
+    app.dependency_overrides.pop(get_login_rate_limiter, None)
+
+
 @pytest.fixture
 async def client():
-    async with AsyncClient(app=app, base_url="http://testserver") as async_client:
+    token = create_access_token("tester@example.com", {"role": ROLE_ADMIN})
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(app=app, base_url="http://testserver", headers=headers) as async_client:
         yield async_client
 
 
@@ -58,3 +90,17 @@ async def client():
 async def db_session():
     async with TestSessionLocal() as session:
         yield session
+
+
+@pytest.fixture
+def session_factory():
+    return TestSessionLocal
+
+
+@pytest.fixture
+def storage(tmp_path):
+    local_storage = LocalStorage(tmp_path / "objects")
+    app.dependency_overrides[get_storage] = lambda: local_storage
+    yield local_storage
+    app.dependency_overrides.pop(get_storage, None)
+    local_storage.close()
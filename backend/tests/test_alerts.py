@@ -1,11 +1,18 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, update
 
-from app.models.db import Alert, Company, Document, Expiration, Worker
-from app.services.alert_service import send_document_alerts
-from app.services.expiration_service import ExpirationStatus
+from app.core.config import settings
+from app.models.db import Alert, Company, Document, Expiration, OutboxMessage, Worker
+from app.services.alert_service import (
+    deliver_outbox,
+    enqueue_document_alerts,
+    send_document_alerts,
+)
+from app.services.expiration_service import ExpirationStatus, verify_expirations
+from app.services.mailer import SMTPMailer
 
 
 @pytest.mark.asyncio
@@ -92,7 +99,7 @@ async def test_send_document_alerts_sends_for_expiring_and_expired(db_session):
 
     summary = await send_document_alerts(db_session, send_email=fake_send)
 
-    assert summary == {"alerts_sent": 2, "skipped": 2}
+    assert summary == {"alerts_sent": 2, "skipped": 1, "scheduled": 1}
     assert len(sent_messages) == 2
     assert all("Ana" not in subject for _, subject, _ in sent_messages)
 
@@ -144,8 +151,372 @@ async def test_send_document_alerts_skips_existing_alerts(db_session):
 
     summary = await send_document_alerts(db_session, send_email=lambda *args, **kwargs: None)
 
-    assert summary == {"alerts_sent": 0, "skipped": 1}
+    assert summary == {"alerts_sent": 0, "skipped": 0, "scheduled": 1}
 
     result = await db_session.scalars(select(Alert))
     alerts = result.all()
     assert len(alerts) == 1
+
+
+class StubSMTPServer:
+    """Minimal in-process SMTP server that records connections and messages."""
+
+    def __init__(self):
+        self.connections = 0
+        self.messages: list[bytes] = []
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        await writer.drain()
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 stub\r\n")
+            elif command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                self.messages.append(await reader.readuntil(b"\r\n.\r\n"))
+                writer.write(b"250 queued\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_send_document_alerts_reuses_pooled_smtp_connections(db_session):
+    stub = StubSMTPServer()
+    port = await stub.start()
+    mailer = SMTPMailer("127.0.0.1", port, size=2, timeout=5)
+
+    now = datetime.now(timezone.utc)
+    company = Company(name="Pool Corp", tax_id="POOL123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    workers = [
+        Worker(
+            company_id=company.id,
+            first_name=f"Trabajador {index}",
+            last_name="Pool",
+            email=f"pool{index}@example.com",
+        )
+        for index in range(6)
+    ]
+    db_session.add_all(workers)
+    await db_session.flush()
+
+    db_session.add_all(
+        [
+            Document(
+                company_id=company.id,
+                worker_id=worker.id,
+                title=f"Documento {worker.id}",
+                file_key=f"pool-{worker.id}.pdf",
+                expires_at=now - timedelta(days=1),
+            )
+            for worker in workers
+        ]
+    )
+    await db_session.commit()
+
+    try:
+        summary = await send_document_alerts(db_session, send_email=mailer.send)
+    finally:
+        # QUIT needs the stub, which runs on this loop, to answer.
+        await asyncio.to_thread(mailer.close)
+        await stub.stop()
+
+    assert summary == {"alerts_sent": 6, "skipped": 0, "scheduled": 0}
+    assert len(stub.messages) == 6
+    assert stub.connections <= 2
+
+    alerts = (await db_session.scalars(select(Alert))).all()
+    assert len(alerts) == 6
+
+
+@pytest.mark.asyncio
+async def test_send_document_alerts_digest_groups_by_recipient(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(
+        name="Digest Corp",
+        tax_id="DIG123",
+        contact_email="prevencion@example.com",
+        compliance_expires_at=now,
+    )
+    db_session.add(company)
+    await db_session.flush()
+
+    worker = Worker(
+        company_id=company.id,
+        first_name="Marta",
+        last_name="Diaz",
+        email="marta@example.com",
+    )
+    db_session.add(worker)
+    await db_session.flush()
+
+    db_session.add_all(
+        [
+            Document(
+                company_id=company.id,
+                worker_id=worker.id,
+                title=f"Certificado {offset}",
+                file_key=f"cert-{offset}.pdf",
+                expires_at=now + timedelta(days=offset),
+            )
+            for offset in (-2, 3, 7)
+        ]
+        + [
+            Document(
+                company_id=company.id,
+                worker_id=None,
+                title="Documento empresa",
+                file_key="company.pdf",
+                expires_at=now + timedelta(days=1),
+            )
+        ]
+    )
+    await db_session.commit()
+
+    sent_messages: list[tuple[str, str, str]] = []
+
+    async def fake_send(recipient: str, subject: str, body: str):
+        sent_messages.append((recipient, subject, body))
+
+    summary = await send_document_alerts(
+        db_session, send_email=fake_send, digest=True, include_company_contacts=True
+    )
+
+    assert summary == {"alerts_sent": 7, "skipped": 1, "scheduled": 0, "emails_sent": 2}
+    recipients = sorted(recipient for recipient, _, _ in sent_messages)
+    assert recipients == ["marta@example.com", "prevencion@example.com"]
+    bodies = {recipient: body for recipient, _, body in sent_messages}
+    assert bodies["marta@example.com"].count("Certificado") == 3
+
+    alerts = (await db_session.scalars(select(Alert))).all()
+    assert sorted(alert.channel for alert in alerts).count("email_company") == 4
+
+    repeat = await send_document_alerts(
+        db_session, send_email=fake_send, digest=True, include_company_contacts=True
+    )
+    # No reminder is due again yet, so nothing is even examined.
+    assert repeat == {"alerts_sent": 0, "skipped": 0, "scheduled": 0, "emails_sent": 0}
+    assert len(sent_messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_failed_deliveries_with_backoff(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_max_attempts", 2)
+    now = datetime.now(timezone.utc)
+    company = Company(name="Outbox Corp", tax_id="OUT123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    worker = Worker(
+        company_id=company.id, first_name="Rosa", last_name="Vega", email="rosa@example.com"
+    )
+    db_session.add(worker)
+    await db_session.flush()
+
+    db_session.add(
+        Document(
+            company_id=company.id,
+            worker_id=worker.id,
+            title="Examen",
+            file_key="exam.pdf",
+            expires_at=now - timedelta(days=1),
+        )
+    )
+    await db_session.commit()
+
+    queued = await enqueue_document_alerts(db_session)
+    assert queued == {"queued": 1, "alerts_queued": 1, "skipped": 0, "scheduled": 0}
+    # Unsent alerts already count, so a second run queues nothing.
+    assert (await enqueue_document_alerts(db_session))["queued"] == 0
+
+    async def failing_send(recipient: str, subject: str, body: str):
+        raise ConnectionError("smtp down")
+
+    first = await deliver_outbox(db_session, send_email=failing_send)
+    assert first == {"claimed": 1, "sent": 0, "retried": 1, "failed": 0, "alerts_sent": 0}
+
+    message = await db_session.scalar(select(OutboxMessage))
+    await db_session.refresh(message)
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert "smtp down" in message.last_error
+    assert message.available_at > datetime.now(timezone.utc)
+
+    # Backing off: nothing is due yet.
+    assert (await deliver_outbox(db_session, send_email=failing_send))["claimed"] == 0
+
+    await db_session.execute(update(OutboxMessage).values(available_at=now))
+    await db_session.commit()
+    second = await deliver_outbox(db_session, send_email=failing_send)
+    assert second["failed"] == 1
+
+    await db_session.refresh(message)
+    assert message.status == "failed"
+    assert (await db_session.scalars(select(Alert))).all() == []
+
+    # The dropped alert is queued again by the next run and delivered.
+    sent: list[str] = []
+
+    async def fake_send(recipient: str, subject: str, body: str):
+        sent.append(recipient)
+
+    summary = await send_document_alerts(db_session, send_email=fake_send)
+    assert summary == {"alerts_sent": 1, "skipped": 0, "scheduled": 0}
+    assert sent == ["rosa@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_reminders_follow_the_configured_stages(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "alert_reminder_days", [30, 15, 7, 1, 0])
+    now = datetime.now(timezone.utc)
+    company = Company(name="Stage Corp", tax_id="STG123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    worker = Worker(
+        company_id=company.id, first_name="Ines", last_name="Soto", email="ines@example.com"
+    )
+    db_session.add(worker)
+    await db_session.flush()
+
+    expires_at = now + timedelta(days=10)
+    document = Document(
+        company_id=company.id,
+        worker_id=worker.id,
+        title="Licencia",
+        file_key="stage.pdf",
+        expires_at=expires_at,
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    async def queue(at):
+        return await enqueue_document_alerts(db_session, now=at)
+
+    async def schedule():
+        expiration = await db_session.scalar(select(Expiration))
+        await db_session.refresh(expiration)
+        return expiration.alert_stage, expiration.next_alert_at
+
+    # 10 days out the 15-day reminder is the most urgent one reached.
+    assert (await queue(now))["queued"] == 1
+    assert await schedule() == (15, expires_at - timedelta(days=7))
+
+    # Not due again until the 7-day mark.
+    assert (await queue(now + timedelta(days=2)))["queued"] == 0
+    assert (await queue(now + timedelta(days=3, minutes=1)))["queued"] == 1
+    assert await schedule() == (7, expires_at - timedelta(days=1))
+
+    # After an outage only the most urgent missed stage is sent.
+    assert (await queue(expires_at + timedelta(hours=1)))["queued"] == 1
+    assert await schedule() == (0, None)
+    assert (await queue(expires_at + timedelta(days=5)))["queued"] == 0
+
+    # Renewing the document starts a new cycle. The edit happened before the
+    # simulated clock, so a full verification is needed to pick it up.
+    document.expires_at = expires_at + timedelta(days=365)
+    await db_session.commit()
+    await verify_expirations(db_session, now=expires_at + timedelta(days=6), full=True)
+    await queue(expires_at + timedelta(days=6))
+    assert await schedule() == (None, document.expires_at - timedelta(days=30))
+
+    alerts = (await db_session.scalars(select(Alert))).all()
+    assert len(alerts) == 3
+
+
+@pytest.mark.asyncio
+async def test_warning_days_sets_the_first_reminder_stage(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "alert_reminder_days", [30, 15, 7, 1, 0])
+    now = datetime.now(timezone.utc)
+    company = Company(name="Aviso Corp", tax_id="AV123")
+    db_session.add(company)
+    await db_session.flush()
+    worker = Worker(
+        company_id=company.id, first_name="Eva", last_name="Rojas", email="eva@example.com"
+    )
+    db_session.add(worker)
+    await db_session.flush()
+    expires_at = now + timedelta(days=12)
+    db_session.add(
+        Document(
+            company_id=company.id,
+            worker_id=worker.id,
+            title="Examen",
+            file_key="aviso.pdf",
+            expires_at=expires_at,
+        )
+    )
+    await db_session.commit()
+
+    # Still vigente with a 10-day warning, so the 30 and 15-day stages are
+    # not used and the first reminder waits for the 10-day mark.
+    queued = await enqueue_document_alerts(db_session, warning_days=10, now=now)
+    assert queued == {"queued": 0, "alerts_queued": 0, "skipped": 0, "scheduled": 1}
+    expiration = await db_session.scalar(select(Expiration))
+    assert expiration.status == ExpirationStatus.VIGENTE
+    assert expiration.next_alert_at == expires_at - timedelta(days=10)
+
+    later = now + timedelta(days=2, minutes=1)
+    queued = await enqueue_document_alerts(db_session, warning_days=10, now=later)
+    assert queued["queued"] == 1
+    await db_session.refresh(expiration)
+    assert expiration.status == ExpirationStatus.POR_VENCER
+    assert (expiration.alert_stage, expiration.next_alert_at) == (
+        10,
+        expires_at - timedelta(days=7),
+    )
+
+
+@pytest.mark.asyncio
+async def test_moving_expiry_back_to_an_alerted_date_queues_again(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(name="Vuelta Corp", tax_id="VU123")
+    db_session.add(company)
+    await db_session.flush()
+    worker = Worker(
+        company_id=company.id, first_name="Rita", last_name="Lagos", email="rita@example.com"
+    )
+    db_session.add(worker)
+    await db_session.flush()
+    original = now + timedelta(days=10)
+    document = Document(
+        company_id=company.id,
+        worker_id=worker.id,
+        title="Permiso",
+        file_key="vuelta.pdf",
+        expires_at=original,
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    assert (await enqueue_document_alerts(db_session, now=now))["queued"] == 1
+
+    # A -> B -> A: the second cycle on date A must not reuse the first's key.
+    for expires_at in (original + timedelta(days=100), original):
+        document.expires_at = expires_at
+        await db_session.commit()
+        await verify_expirations(db_session, now=now, full=True)
+
+    assert (await enqueue_document_alerts(db_session, now=now))["queued"] == 1
+    keys = (await db_session.scalars(select(OutboxMessage.idempotency_key))).all()
+    assert len(set(keys)) == 2
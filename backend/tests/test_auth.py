@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import InvalidTokenError, TokenVerifier, create_access_token
+from app.main import app
+from app.services.user_service import ensure_admin_user
+
+
+def _token(secret: str = "secret", algorithm: str = "HS256", **claims) -> str:
+    payload = {"sub": "user@example.com", "exp": int(time.time()) + 60, **claims}
+    return jwt.encode(payload, secret, algorithm=algorithm)
+
+
+@pytest.mark.asyncio
+async def test_protected_routes_require_a_valid_token(client):
+    async with AsyncClient(app=app, base_url="http://testserver") as anonymous:
+        missing = await anonymous.get("/companies/")
+        forged = await anonymous.get(
+            "/companies/", headers={"Authorization": f"Bearer {_token(secret='wrong')}"}
+        )
+        health = await anonymous.get("/health")
+
+    assert missing.status_code == 401
+    assert missing.headers["www-authenticate"] == "Bearer"
+    assert forged.status_code == 401
+    assert health.status_code == 200
+    assert (await client.get("/companies/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_login_token_is_accepted(db_session):
+    await ensure_admin_user(db_session)
+    async with AsyncClient(app=app, base_url="http://testserver") as anonymous:
+        login = await anonymous.post(
+            "/auth/login",
+            json={"email": settings.admin_email, "password": settings.admin_password},
+        )
+        token = login.json()["access_token"]
+        response = await anonymous.get("/companies/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS512"])
+def test_hmac_fast_path_matches_jose(algorithm):
+    verifier = TokenVerifier("secret", algorithm)
+    token = _token(algorithm=algorithm, name="Ana")
+
+    assert verifier.verify(token) == jwt.decode(token, "secret", algorithms=[algorithm])
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        _token(secret="other"),
+        _token(algorithm="HS512"),
+        _token(exp=int(time.time()) - 1),
+        _token(nbf=int(time.time()) + 60),
+        jwt.encode({"sub": "user@example.com"}, "secret", algorithm="HS256"),
+        "not-a-token",
+        "a.b.c",
+    ],
+)
+def test_invalid_tokens_are_rejected(token):
+    with pytest.raises(InvalidTokenError):
+        TokenVerifier("secret", "HS256").verify(token)
+
+
+def test_verified_tokens_are_cached_until_expiry(monkeypatch):
+    verifier = TokenVerifier("secret", "HS256", max_entries=2)
+    calls = []
+    original = verifier._verify
+    monkeypatch.setattr(verifier, "_verify", lambda token: calls.append(token) or original(token))
+    token = _token()
+
+    verifier.verify(token)
+    verifier.verify(token)
+    assert len(calls) == 1
+
+    verifier.verify(_token(name="b"))
+    verifier.verify(_token(name="c"))
+    verifier.verify(token)
+    assert len(calls) == 4
+
+    expires_at = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: expires_at)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+
+
+def test_non_hmac_algorithms_use_jose():
+    verifier = TokenVerifier(settings.jwt_secret_key, "HS256")
+    verifier._hmac = None
+
+    claims = verifier.verify(create_access_token("user@example.com"))
+
+    assert claims["sub"] == "user@example.com"
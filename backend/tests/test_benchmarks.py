@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.db import Company, Document, Worker
+from app.services.alert_service import send_document_alerts
+from benchmarks.compare import Change, compare
+from benchmarks.datagen import DatasetSize, generate
+from benchmarks.jobs import StubSender
+
+
+@pytest.mark.asyncio
+async def test_generate_inserts_requested_dataset(db_session):
+    size = DatasetSize(companies=3, workers_per_company=4, documents_per_worker=2)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    await generate(db_session, size, seed=1, now=now)
+
+    assert await db_session.scalar(select(func.count()).select_from(Company)) == 3
+    assert await db_session.scalar(select(func.count()).select_from(Worker)) == 12
+    assert await db_session.scalar(select(func.count()).select_from(Document)) == 24
+
+
+@pytest.mark.asyncio
+async def test_stub_sender_is_accepted_by_alert_run(db_session):
+    await generate(db_session, DatasetSize(1, 2, 5), seed=2)
+    sender = StubSender()
+
+    summary = await send_document_alerts(db_session, sender.send)
+
+    assert sender.sent == summary["alerts_sent"]
+
+
+def test_compare_flags_only_meaningful_slowdowns():
+    baseline = {"benchmark": "jobs", "results": {"verify": {"p50_ms": 100.0}, "tiny": {"p50_ms": 0.1}}}
+    candidate = {"benchmark": "jobs", "results": {"verify": {"p50_ms": 130.0}, "tiny": {"p50_ms": 0.5}}}
+
+    changes = {change.name: change for change in compare(baseline, candidate)}
+
+    assert changes["verify"].regressed(threshold=0.2, min_delta_ms=1.0)
+    assert not changes["tiny"].regressed(threshold=0.2, min_delta_ms=1.0)
+    assert not Change("verify", "p50_ms", 100.0, 110.0).regressed(0.2, 1.0)
@@ -0,0 +1,120 @@
+import pytest
+
+from app.core.cache import MemoryBackend, RedisBackend, ResponseCache, get_cache
+from app.main import app
+
+
+class FakeRedis:
+    """In-memory stand-in for the parts of ``redis.asyncio.Redis`` the cache uses."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+    async def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+
+@pytest.mark.asyncio
+async def test_get_company_is_cached_with_etag_and_invalidated_on_update(client):
+    created = await client.post("/companies/", json={"name": "Cache", "tax_id": "CA1"})
+    company_id = created.json()["id"]
+
+    first = await client.get(f"/companies/{company_id}")
+    assert first.headers["x-cache"] == "MISS"
+    etag = first.headers["etag"]
+
+    second = await client.get(f"/companies/{company_id}")
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+
+    not_modified = await client.get(f"/companies/{company_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    await client.put(f"/companies/{company_id}", json={"name": "Cache 2", "tax_id": "CA1"})
+
+    updated = await client.get(f"/companies/{company_id}", headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["x-cache"] == "MISS"
+    assert updated.json()["name"] == "Cache 2"
+    assert updated.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_pages_are_dropped_when_the_collection_changes(client):
+    await client.post("/companies/", json={"name": "Uno", "tax_id": "L1"})
+    listing = await client.get("/companies/", params={"limit": 10})
+    assert len(listing.json()) == 1
+    assert (await client.get("/companies/", params={"limit": 10})).headers["x-cache"] == "HIT"
+
+    await client.post("/companies/", json={"name": "Dos", "tax_id": "L2"})
+
+    refreshed = await client.get("/companies/", params={"limit": 10})
+    assert refreshed.headers["x-cache"] == "MISS"
+    assert len(refreshed.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_pagination_cursor_header_is_cached(client):
+    for index in range(3):
+        await client.post("/companies/", json={"name": f"C{index}", "tax_id": f"P{index}"})
+
+    first = await client.get("/companies/", params={"limit": 2})
+    cached = await client.get("/companies/", params={"limit": 2})
+    assert cached.headers["x-cache"] == "HIT"
+    assert cached.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_serves_and_invalidates_entries(client):
+    fake = FakeRedis()
+    app.dependency_overrides[get_cache] = lambda: ResponseCache(RedisBackend(fake), ttl=60)
+
+    company = (await client.post("/companies/", json={"name": "Redis", "tax_id": "R1"})).json()
+    worker_payload = {
+        "company_id": company["id"],
+        "first_name": "Rita",
+        "last_name": "Rojas",
+        "email": "rita@example.com",
+    }
+    worker = (await client.post("/workers/", json=worker_payload)).json()
+
+    assert (await client.get(f"/workers/{worker['id']}")).headers["x-cache"] == "MISS"
+    assert (await client.get(f"/workers/{worker['id']}")).headers["x-cache"] == "HIT"
+    assert f"controldoc:cache:worker:{worker['id']}" in fake.data
+
+    await client.delete(f"/companies/{company['id']}")
+    assert f"controldoc:cache:worker:{worker['id']}" not in fake.data
+    assert (await client.get(f"/workers/{worker['id']}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_and_expired_entries():
+    backend = MemoryBackend(max_entries=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    await backend.get("a")
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+
+    await backend.set("expired", b"4", ttl=0)
+    assert await backend.get("expired") is None
@@ -97,3 +97,36 @@ async def test_worker_requires_company(client: AsyncClient):
     response = await client.post("/workers/", json=worker_payload)
     assert response.status_code == 404
     assert response.json()["detail"] == "Company not found"
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_use_keyset_pagination(client: AsyncClient):
+    company_ids = []
+    for index in range(3):
+        response = await client.post(
+            "/companies/",
+            json={"name": f"Page {index}", "tax_id": f"PAGE{index}"},
+        )
+        company_ids.append(response.json()["id"])
+
+    first_page = await client.get("/companies/", params={"limit": 2})
+    assert [company["id"] for company in first_page.json()] == company_ids[:2]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = await client.get("/companies/", params={"limit": 2, "cursor": cursor})
+    assert [company["id"] for company in second_page.json()] == company_ids[2:]
+    assert "X-Next-Cursor" not in second_page.headers
+
+    for company_id in company_ids[:2]:
+        await client.post(
+            "/workers/",
+            json={
+                "company_id": company_id,
+                "first_name": "Filtro",
+                "last_name": str(company_id),
+                "email": f"filtro{company_id}@example.com",
+            },
+        )
+
+    filtered = await client.get("/workers/", params={"company_id": company_ids[1]})
+    assert [worker["company_id"] for worker in filtered.json()] == [company_ids[1]]
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import ReplicaLagGuard, engine_options
+
+POSTGRES_URL = "postgresql+asyncpg://user:secret@db:5432/controldoc"
+
+
+def test_engine_options_apply_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 3)
+    monkeypatch.setattr(settings, "db_max_overflow", 2)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+
+    options = engine_options(POSTGRES_URL)
+    engine = create_async_engine(POSTGRES_URL, **options)
+
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool._pre_ping is True
+    connect_args = options["connect_args"]
+    assert connect_args["server_settings"]["statement_timeout"] == "5000"
+    assert connect_args["statement_cache_size"] == settings.db_statement_cache_size
+
+
+def test_engine_options_disable_prepared_statement_caching_for_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+
+    connect_args = engine_options(POSTGRES_URL)["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert "server_settings" not in connect_args
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_engine_options_leave_sqlite_untouched():
+    assert engine_options("sqlite+aiosqlite:///:memory:") == {}
+
+
+class StubGuard(ReplicaLagGuard):
+    def __init__(self, lags, **kwargs):
+        super().__init__(engine=None, **kwargs)
+        self.lags = list(lags)
+        self.checks = 0
+
+    async def _measure(self):
+        self.checks += 1
+        lag = self.lags.pop(0)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_guard_falls_back_when_lagging_or_unreachable():
+    guard = StubGuard([0.5, 30.0, ConnectionError("down")], max_lag=5, check_interval=0)
+
+    assert await guard.healthy() is True
+    assert await guard.healthy() is False
+    assert await guard.healthy() is False
+    assert guard.lag is None
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_guard_caches_its_measurement():
+    guard = StubGuard([0.0], max_lag=5, check_interval=60)
+
+    assert await guard.healthy() is True
+    assert await guard.healthy() is True
+    assert guard.checks == 1
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_use_the_replica_only_while_it_is_fresh(monkeypatch):
+    replica_factory = object()
+    guard = StubGuard([1.0, 60.0], max_lag=5, check_interval=0)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", replica_factory)
+    monkeypatch.setattr(database, "replica_guard", guard)
+
+    assert await database.get_read_session_factory() is replica_factory
+    assert await database.get_read_session_factory() is database.SessionLocal
+
+
+async def test_cached_endpoints_never_fill_from_the_replica(client):
+    from app.core.database import get_read_session
+    from app.main import app
+
+    async def replica_session():
+        raise AssertionError("cached responses must be built from the primary")
+        yield
+
+    previous = app.dependency_overrides[get_read_session]
+    app.dependency_overrides[get_read_session] = replica_session
+    try:
+        for path in ("/companies/", "/workers/", "/documentos/", "/estadisticas"):
+            response = await client.get(path)
+            assert response.status_code == 200, path
+    finally:
+        app.dependency_overrides[get_read_session] = previous
@@ -0,0 +1,339 @@
+import hashlib
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+from starlette.datastructures import Headers
+from sqlalchemy.exc import IntegrityError
+
+from app.core import storage as storage_module
+from app.core.config import settings
+from app.core.storage import MinioStorage
+from app.models.db import Company, Document, StoredObject
+from app.services.document_service import blob_key, purge_unreferenced_objects, store_upload
+
+
+async def _create_company(client: AsyncClient) -> int:
+    response = await client.post("/companies/", json={"name": "Docs", "tax_id": "DOC123"})
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_upload_document_streams_to_storage(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+    content = b"%PDF-1.4 contenido"
+
+    response = await client.post(
+        "/documentos/",
+        data={"company_id": str(company_id), "title": "Seguro"},
+        files={"file": ("seguro.pdf", content, "application/pdf")},
+    )
+
+    assert response.status_code == 201
+    document = response.json()
+    assert document["file_key"] == blob_key(hashlib.sha256(content).hexdigest())
+    assert storage.path_for(document["file_key"]).read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_upload_document_rejects_oversized_files(
+    client: AsyncClient, storage, monkeypatch
+):
+    monkeypatch.setattr(settings, "max_upload_size_bytes", 8)
+    company_id = await _create_company(client)
+
+    response = await client.post(
+        "/documentos/",
+        data={"company_id": str(company_id), "title": "Grande"},
+        files={"file": ("grande.pdf", b"0123456789", "application/pdf")},
+    )
+
+    assert response.status_code == 413
+    assert not any(path.is_file() for path in storage.root.rglob("*"))
+
+    listing = await client.get("/documentos/")
+    assert listing.json() == []
+
+
+class FakeMinio:
+    def __init__(self):
+        self.bucket_checks = 0
+        self.objects: dict[str, bytes] = {}
+
+    def bucket_exists(self, bucket_name):
+        self.bucket_checks += 1
+        return False
+
+    def make_bucket(self, bucket_name):
+        pass
+
+    def put_object(self, bucket_name, object_name, data, length, content_type, part_size):
+        self.objects[object_name] = data.read(length)
+
+
+@pytest.mark.asyncio
+async def test_minio_storage_checks_bucket_once(monkeypatch):
+    monkeypatch.setattr(storage_module, "_verified_buckets", set())
+    client = FakeMinio()
+    backend = MinioStorage("bucket", client=client)
+
+    for index in range(3):
+        await backend.put_object(f"object-{index}", io.BytesIO(b"data"), length=4)
+    backend.close()
+
+    assert client.bucket_checks == 1
+    assert client.objects == {f"object-{index}": b"data" for index in range(3)}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upload_reports_per_file_results(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+    worker = await client.post(
+        "/workers/",
+        json={
+            "company_id": company_id,
+            "first_name": "Bulk",
+            "last_name": "Worker",
+            "email": "bulk@example.com",
+        },
+    )
+    worker_id = worker.json()["id"]
+
+    metadata = [
+        {"title": "Seguro", "worker_id": worker_id, "expires_at": "2030-01-01T00:00:00Z"},
+        {"title": "Foto", "worker_id": None},
+        {"title": "Texto"},
+        {"title": "Ajeno", "worker_id": worker_id + 100},
+    ]
+    files = [
+        ("files", ("seguro.pdf", b"%PDF-1", "application/pdf")),
+        ("files", ("foto.jpg", b"\xff\xd8\xff", "image/jpeg")),
+        ("files", ("notas.txt", b"hola", "text/plain")),
+        ("files", ("ajeno.pdf", b"%PDF-2", "application/pdf")),
+    ]
+
+    response = await client.post(
+        "/documentos/bulk",
+        data={"company_id": str(company_id), "metadata": json.dumps(metadata)},
+        files=files,
+    )
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    assert [result["success"] for result in body["results"]] == [True, True, False, False]
+    assert body["results"][0]["document"]["worker_id"] == worker_id
+    assert body["results"][3]["detail"] == "Worker not found"
+
+    for result in body["results"][:2]:
+        assert storage.path_for(result["document"]["file_key"]).is_file()
+
+    listing = await client.get("/documentos/", params={"company_id": company_id})
+    assert sorted(document["title"] for document in listing.json()) == ["Foto", "Seguro"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upload_requires_metadata_per_file(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+
+    response = await client.post(
+        "/documentos/bulk",
+        data={"company_id": str(company_id), "metadata": json.dumps([{"title": "Uno"}])},
+        files=[
+            ("files", ("uno.pdf", b"1", "application/pdf")),
+            ("files", ("dos.pdf", b"2", "application/pdf")),
+        ],
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_presigned_upload_flow(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+
+    ticket = await client.post(
+        "/documentos/upload-url",
+        json={"company_id": company_id, "filename": "directo.pdf", "content_type": "application/pdf"},
+    )
+    assert ticket.status_code == 200
+    file_key = ticket.json()["file_key"]
+    assert ticket.json()["upload_url"].startswith("file://")
+
+    payload = {"company_id": company_id, "worker_id": None, "title": "Directo", "file_key": file_key}
+    premature = await client.post("/documentos/complete", json=payload)
+    assert premature.status_code == 400
+
+    # Simulates the client PUT against the presigned URL.
+    await storage.put_object(file_key, io.BytesIO(b"%PDF-directo"), length=12)
+
+    completed = await client.post("/documentos/complete", json=payload)
+    assert completed.status_code == 201
+    document = completed.json()
+    assert document["file_key"] == file_key
+
+    download = await client.get(f"/documentos/{document['id']}/download-url")
+    assert download.status_code == 200
+    assert download.json()["url"] == storage.path_for(file_key).as_uri()
+
+    repeated = await client.post("/documentos/complete", json=payload)
+    assert repeated.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_presigned_complete_rejects_disallowed_content(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+    file_key = f"companies/{company_id}/script.sh"
+    await storage.put_object(file_key, io.BytesIO(b"#!/bin/sh"), length=9)
+
+    response = await client.post(
+        "/documentos/complete",
+        json={"company_id": company_id, "worker_id": None, "title": "Script", "file_key": file_key},
+    )
+
+    assert response.status_code == 400
+    assert not storage.path_for(file_key).exists()
+
+
+@pytest.mark.asyncio
+async def test_presigned_complete_rejects_foreign_keys(client: AsyncClient, storage):
+    company_id = await _create_company(client)
+
+    response = await client.post(
+        "/documentos/complete",
+        json={
+            "company_id": company_id,
+            "worker_id": None,
+            "title": "Ajeno",
+            "file_key": f"companies/{company_id + 1}/otro.pdf",
+        },
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_object(client: AsyncClient, storage, db_session):
+    company_id = await _create_company(client)
+    content = b"%PDF-poliza compartida"
+
+    async def upload(title: str) -> dict:
+        response = await client.post(
+            "/documentos/",
+            data={"company_id": str(company_id), "title": title},
+            files={"file": (f"{title}.pdf", content, "application/pdf")},
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    first = await upload("uno")
+    # Removing the object proves the second upload does not write it again.
+    storage.path_for(first["file_key"]).unlink()
+    second = await upload("dos")
+
+    assert first["file_key"] == second["file_key"]
+    assert not storage.path_for(first["file_key"]).exists()
+
+    stored = await db_session.get(StoredObject, hashlib.sha256(content).hexdigest())
+    assert stored.ref_count == 2
+
+    await storage.put_object(first["file_key"], io.BytesIO(content), length=len(content))
+    for document in (first, second):
+        response = await client.delete(f"/documentos/{document['id']}")
+        assert response.status_code == 204
+
+    await db_session.refresh(stored)
+    assert stored.ref_count == 0
+    assert storage.path_for(first["file_key"]).exists()
+
+    purged = await purge_unreferenced_objects(db_session, storage, grace=timedelta(0))
+    assert purged == 1
+    assert not storage.path_for(first["file_key"]).exists()
+
+
+@pytest.mark.asyncio
+async def test_deleting_owners_releases_document_objects(client: AsyncClient, storage, db_session):
+    company_id = await _create_company(client)
+    worker = await client.post(
+        "/workers/",
+        json={
+            "company_id": company_id,
+            "first_name": "Ana",
+            "last_name": "Rojas",
+            "email": "ana@example.com",
+        },
+    )
+    worker_id = worker.json()["id"]
+    content = b"%PDF-licencia"
+    for title, owner in (("uno", worker_id), ("dos", worker_id), ("tres", None)):
+        data = {"company_id": str(company_id), "title": title}
+        if owner is not None:
+            data["worker_id"] = str(owner)
+        response = await client.post(
+            "/documentos/", data=data, files={"file": (f"{title}.pdf", content, "application/pdf")}
+        )
+        assert response.status_code == 201
+    direct_key = f"companies/{company_id}/directo.pdf"
+    await storage.put_object(direct_key, io.BytesIO(b"%PDF-directo"), length=12)
+    completed = await client.post(
+        "/documentos/complete",
+        json={"company_id": company_id, "worker_id": None, "title": "Directo", "file_key": direct_key},
+    )
+    assert completed.status_code == 201
+
+    stored = await db_session.get(StoredObject, hashlib.sha256(content).hexdigest())
+    assert stored.ref_count == 3
+
+    assert (await client.delete(f"/workers/{worker_id}")).status_code == 204
+    await db_session.refresh(stored)
+    assert stored.ref_count == 1
+
+    assert (await client.delete(f"/companies/{company_id}")).status_code == 204
+    await db_session.refresh(stored)
+    assert stored.ref_count == 0
+    assert not storage.path_for(direct_key).exists()
+    assert await purge_unreferenced_objects(db_session, storage, grace=timedelta(0)) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_content_addressed_keys_may_be_shared(db_session):
+    company = Company(name="Claves", tax_id="KEY1")
+    db_session.add(company)
+    await db_session.flush()
+    shared = blob_key("ab" * 32)
+    db_session.add_all(
+        [
+            Document(company_id=company.id, title="Uno", file_key=shared),
+            Document(company_id=company.id, title="Dos", file_key=shared),
+            Document(company_id=company.id, title="Tres", file_key=f"companies/{company.id}/a.pdf"),
+        ]
+    )
+    await db_session.commit()
+
+    duplicate = Document(company_id=company.id, title="Cuatro", file_key=f"companies/{company.id}/a.pdf")
+    db_session.add(duplicate)
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
+    await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_blob_of_an_uncommitted_upload_is_purged(db_session, storage):
+    content = b"%PDF-abandonado"
+    file = UploadFile(
+        io.BytesIO(content), filename="a.pdf", headers=Headers({"content-type": "application/pdf"})
+    )
+
+    file_key = await store_upload(db_session, storage, file)
+    # The document insert fails, taking the reference with it.
+    await db_session.rollback()
+
+    stored = await db_session.get(StoredObject, hashlib.sha256(content).hexdigest())
+    assert stored.ref_count == 0
+    assert storage.path_for(file_key).exists()
+    assert await purge_unreferenced_objects(db_session, storage, grace=timedelta(0)) == 1
+    assert not storage.path_for(file_key).exists()
@@ -90,3 +90,120 @@ async def test_verify_updates_existing_expiration(db_session):
     )
     assert refreshed.status == ExpirationStatus.VENCIDO
     assert refreshed.expires_at == document.expires_at
+
+
+@pytest.mark.asyncio
+async def test_verify_expirations_is_idempotent(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(name="Repeat Co", tax_id="RPT123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    db_session.add_all(
+        [
+            Document(
+                company_id=company.id,
+                worker_id=None,
+                title=f"Documento {offset}",
+                file_key=f"doc-{offset}.pdf",
+                expires_at=now + timedelta(days=offset),
+            )
+            for offset in (-3, 3, 60)
+        ]
+        + [
+            Document(
+                company_id=company.id,
+                worker_id=None,
+                title="Sin vencimiento",
+                file_key="no-expiry.pdf",
+                expires_at=None,
+            )
+        ]
+    )
+    await db_session.commit()
+
+    first = await verify_expirations(db_session, warning_days=10)
+    second = await verify_expirations(db_session, warning_days=10)
+
+    assert first == {"processed": 3, "created": 3, "updated": 0}
+    assert second == {"processed": 3, "created": 0, "updated": 0}
+
+
+@pytest.mark.asyncio
+async def test_incremental_verification_only_touches_crossed_boundaries(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(name="Incremental", tax_id="INC123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    crossing = Document(
+        company_id=company.id,
+        worker_id=None,
+        title="Cruza umbral",
+        file_key="crossing.pdf",
+        expires_at=now + timedelta(days=20),
+    )
+    distant = Document(
+        company_id=company.id,
+        worker_id=None,
+        title="Lejano",
+        file_key="distant.pdf",
+        expires_at=now + timedelta(days=400),
+    )
+    db_session.add_all([crossing, distant])
+    await db_session.commit()
+
+    # Start after the documents were written so only boundary crossings remain.
+    first = await verify_expirations(db_session, warning_days=10, now=now + timedelta(days=1))
+    assert first == {"processed": 2, "created": 2, "updated": 0}
+
+    later = now + timedelta(days=15)
+    second = await verify_expirations(db_session, warning_days=10, now=later)
+    assert second == {"processed": 1, "created": 0, "updated": 1}
+
+    expiration = await db_session.scalar(
+        select(Expiration).where(Expiration.document_id == crossing.id)
+    )
+    assert expiration.status == ExpirationStatus.POR_VENCER
+
+    full = await verify_expirations(db_session, warning_days=10, now=later, full=True)
+    assert full == {"processed": 2, "created": 0, "updated": 0}
+
+
+@pytest.mark.asyncio
+async def test_incremental_verification_picks_up_edited_documents(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(name="Edited", tax_id="EDT123", compliance_expires_at=now)
+    db_session.add(company)
+    await db_session.flush()
+
+    document = Document(
+        company_id=company.id,
+        worker_id=None,
+        title="Editado",
+        file_key="edited.pdf",
+        expires_at=now + timedelta(days=200),
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    await verify_expirations(db_session, warning_days=10)
+
+    document.expires_at = now - timedelta(days=1)
+    added = Document(
+        company_id=company.id,
+        worker_id=None,
+        title="Nuevo",
+        file_key="new.pdf",
+        expires_at=now + timedelta(days=200),
+    )
+    db_session.add(added)
+    await db_session.commit()
+
+    summary = await verify_expirations(db_session, warning_days=10)
+    assert summary == {"processed": 2, "created": 1, "updated": 1}
+
+    expiration = await db_session.scalar(
+        select(Expiration).where(Expiration.document_id == document.id)
+    )
+    assert expiration.status == ExpirationStatus.VENCIDO
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.db import Company, Document, Expiration, Worker
+from app.services.expiration_service import ExpirationStatus
+
+
+async def _seed(db_session):
+    now = datetime.now(timezone.utc)
+    company = Company(name="Export Co", tax_id="EXP123")
+    db_session.add(company)
+    await db_session.flush()
+
+    worker = Worker(
+        company_id=company.id,
+        first_name="Eva",
+        last_name="Rojas",
+        email="eva@example.com",
+    )
+    db_session.add(worker)
+    await db_session.flush()
+
+    documents = [
+        Document(
+            company_id=company.id,
+            worker_id=worker.id,
+            title="Seguro",
+            file_key="insurance.pdf",
+            expires_at=now + timedelta(days=5),
+        ),
+        Document(
+            company_id=company.id,
+            worker_id=None,
+            title="Sin responsable",
+            file_key="orphan.pdf",
+            expires_at=None,
+        ),
+    ]
+    db_session.add_all(documents)
+    await db_session.flush()
+
+    db_session.add(
+        Expiration(
+            document_id=documents[0].id,
+            expires_at=documents[0].expires_at,
+            status=ExpirationStatus.POR_VENCER,
+        )
+    )
+    await db_session.commit()
+    return company, worker, documents
+
+
+@pytest.mark.asyncio
+async def test_export_documents_ndjson(client: AsyncClient, db_session):
+    company, worker, documents = await _seed(db_session)
+
+    response = await client.get("/exports/documents")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["document_id"] for row in rows] == [document.id for document in documents]
+    assert rows[0]["company_name"] == "Export Co"
+    assert rows[0]["worker_email"] == "eva@example.com"
+    assert rows[0]["expiration_status"] == ExpirationStatus.POR_VENCER
+    assert rows[1]["worker_id"] is None
+    assert rows[1]["expiration_status"] is None
+
+
+@pytest.mark.asyncio
+async def test_export_documents_csv_filtered_by_status(client: AsyncClient, db_session):
+    await _seed(db_session)
+
+    response = await client.get(
+        "/exports/documents", params={"format": "csv", "status": ExpirationStatus.POR_VENCER}
+    )
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Seguro"
+    assert rows[0]["worker_last_name"] == "Rojas"
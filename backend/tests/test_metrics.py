@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import Histogram, http_request_db_queries, storage_operation_duration
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    lines = histogram.render()
+
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_requests_are_recorded_by_route_template(client):
+    created = await client.post("/companies/", json={"name": "Metrics", "tax_id": "ME1"})
+    company_id = created.json()["id"]
+    queries_before = http_request_db_queries.sum(method="GET", route="/companies/{company_id}")
+
+    await client.get(f"/companies/{company_id}")
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/companies/{company_id}",status="200"}'
+        in response.text
+    )
+    assert f"/companies/{company_id}" not in response.text
+    assert http_request_db_queries.sum(method="GET", route="/companies/{company_id}") > queries_before
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_is_opt_in(client, monkeypatch):
+    response = await client.get("/companies/")
+    assert "server-timing" not in response.headers
+
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    response = await client.get("/companies/")
+
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert "db;dur=" in response.headers["server-timing"]
+
+
+@pytest.mark.asyncio
+async def test_storage_calls_are_timed(storage):
+    labels = {"backend": type(storage).__name__, "operation": "stat_object", "outcome": "ok"}
+    before = storage_operation_duration.count(**labels)
+
+    await storage.stat_object("missing")
+
+    assert storage_operation_duration.count(**labels) == before + 1
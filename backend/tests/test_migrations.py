@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.models.db import Base
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    path = tmp_path / "migrations.db"
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    config.attributes["configure_logger"] = False
+    engine = create_engine(f"sqlite:///{path}")
+    yield config, engine
+    engine.dispose()
+
+
+def test_migrations_match_models(alembic_config):
+    config, engine = alembic_config
+
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_baseline_database_upgrades_and_drops_duplicate_expirations(alembic_config):
+    config, engine = alembic_config
+    command.upgrade(config, "0001")
+    with engine.begin() as connection:
+        # 0001 is the pre-migrations schema that `alembic stamp 0001` adopts.
+        assert set(inspect(connection).get_table_names()) == {
+            "alembic_version",
+            "companies",
+            "workers",
+            "documents",
+            "expirations",
+            "alerts",
+        }
+        connection.execute(text("INSERT INTO companies (id, name, tax_id) VALUES (1, 'Acme', '1-9')"))
+        connection.execute(
+            text(
+                "INSERT INTO documents (id, company_id, title, file_key) "
+                "VALUES (1, 1, 'Permiso', 'k1')"
+            )
+        )
+        for expiration_id in (1, 2):
+            connection.execute(
+                text(
+                    "INSERT INTO expirations (id, document_id, expires_at, status) "
+                    "VALUES (:id, 1, '2030-01-01', 'vigente')"
+                ),
+                {"id": expiration_id},
+            )
+
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        assert connection.scalars(text("SELECT id FROM expirations")).all() == [1]
+        indexes = {index["name"]: index for index in inspect(connection).get_indexes("expirations")}
+    assert indexes["ix_expirations_document_id"]["unique"]
+
+
+def test_downgrade_to_base(alembic_config):
+    config, engine = alembic_config
+    command.upgrade(config, "head")
+
+    command.downgrade(config, "base")
+
+    with engine.connect() as connection:
+        assert inspect(connection).get_table_names() == ["alembic_version"]
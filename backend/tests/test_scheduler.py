@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.core.scheduler import LeaderLock, Scheduler
+
+
+class FollowerLock:
+    held = False
+
+    async def acquire(self):
+        return False
+
+    async def release(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_and_records_durations(session_factory):
+    scheduler = Scheduler(session_factory, LeaderLock(session_factory.kw["bind"], key=1))
+    calls = []
+
+    async def job(session):
+        calls.append(session)
+        return {"processed": 0}
+
+    async def broken(session):
+        raise RuntimeError("boom")
+
+    scheduler.add_job("job", 0.01, job)
+    scheduler.add_job("broken", 60, broken)
+
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    metrics = scheduler.metrics()
+    assert len(calls) >= 2
+    assert metrics["job"]["runs"] == len(calls)
+    assert metrics["job"]["failures"] == 0
+    assert metrics["job"]["last_duration_seconds"] is not None
+    assert metrics["job"]["average_duration_seconds"] <= metrics["job"]["max_duration_seconds"]
+    assert metrics["broken"] == {
+        **metrics["broken"],
+        "runs": 1,
+        "failures": 1,
+        "last_error": "RuntimeError('boom')",
+    }
+
+
+@pytest.mark.asyncio
+async def test_scheduler_skips_jobs_without_leadership(session_factory):
+    scheduler = Scheduler(session_factory, FollowerLock())
+    calls = []
+
+    async def job(session):
+        calls.append(session)
+
+    scheduled = scheduler.add_job("job", 60, job)
+
+    assert await scheduler.run_job(scheduled) is False
+    assert calls == []
+    assert scheduled.stats.skipped == 1
+    assert scheduled.stats.runs == 0
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models.db import Company, CompanyStats, Document, Worker
+from app.services.expiration_service import refresh_company_stats, verify_expirations
+
+
+@pytest.mark.asyncio
+async def test_statistics_are_served_from_refreshed_aggregates(client, db_session):
+    now = datetime.now(timezone.utc)
+    acme = Company(name="Acme", tax_id="ST1")
+    empty = Company(name="Vacia", tax_id="ST2")
+    db_session.add_all([acme, empty])
+    await db_session.flush()
+
+    worker = Worker(company_id=acme.id, first_name="Eva", last_name="Rios", email="eva@example.com")
+    db_session.add(worker)
+    await db_session.flush()
+
+    db_session.add_all(
+        [
+            Document(
+                company_id=acme.id,
+                worker_id=worker.id,
+                title=f"Doc {offset}",
+                file_key=f"stats-{offset}.pdf",
+                expires_at=now + timedelta(days=offset) if offset is not None else None,
+            )
+            for offset in (-3, 5, 10, 90, None)
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get("/estadisticas")
+    assert response.status_code == 200
+    assert response.json()["companies"] == []
+
+    await client.post("/expirations/verify")
+
+    response = await client.get("/estadisticas")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["vigentes"], data["por_vencer"], data["vencidos"]) == (1, 2, 1)
+    assert (data["workers"], data["documents"]) == (1, 5)
+    assert data["refreshed_at"] is not None
+    assert [company["name"] for company in data["companies"]] == ["Acme", "Vacia"]
+    assert data["companies"][1] == {
+        "company_id": empty.id,
+        "name": "Vacia",
+        "vigentes": 0,
+        "por_vencer": 0,
+        "vencidos": 0,
+        "workers": 0,
+        "documents": 0,
+    }
+
+    # Changes show up after the next verification, not on read.
+    db_session.add(Worker(company_id=empty.id, first_name="Leo", last_name="Paz", email="leo@example.com"))
+    await db_session.commit()
+    assert (await client.get("/estadisticas")).json()["workers"] == 1
+
+    await client.post("/expirations/verify")
+    assert (await client.get("/estadisticas")).json()["workers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_incremental_verification_refreshes_only_changed_companies(db_session):
+    now = datetime.now(timezone.utc)
+    changed = Company(name="Cambia", tax_id="ST3")
+    untouched = Company(name="Igual", tax_id="ST4")
+    db_session.add_all([changed, untouched])
+    await db_session.flush()
+    document = Document(
+        company_id=changed.id,
+        title="Poliza",
+        file_key="stats-p.pdf",
+        expires_at=now + timedelta(days=90),
+    )
+    db_session.add(document)
+    await db_session.commit()
+    await verify_expirations(db_session, now=now)
+
+    document.expires_at = now - timedelta(days=1)
+    db_session.add(
+        Worker(company_id=untouched.id, first_name="Ivo", last_name="Paz", email="ivo@example.com")
+    )
+    await db_session.commit()
+    await verify_expirations(db_session, now=now + timedelta(minutes=1))
+
+    stats = {
+        row.company_id: row
+        for row in await db_session.scalars(
+            select(CompanyStats).execution_options(populate_existing=True)
+        )
+    }
+    assert (stats[changed.id].vigentes, stats[changed.id].vencidos) == (0, 1)
+    assert stats[untouched.id].workers == 0
+
+    assert await refresh_company_stats(db_session, now) == 2
+    await db_session.commit()
+    await db_session.refresh(stats[untouched.id])
+    assert stats[untouched.id].workers == 1
+
+
+@pytest.mark.asyncio
+async def test_renaming_a_company_drops_cached_statistics(client):
+    created = await client.post("/companies/", json={"name": "Antes", "tax_id": "ST5"})
+    company_id = created.json()["id"]
+    await client.post("/expirations/verify")
+    assert (await client.get("/estadisticas")).json()["companies"][0]["name"] == "Antes"
+
+    await client.put(f"/companies/{company_id}", json={"name": "Despues", "tax_id": "ST5"})
+
+    response = await client.get("/estadisticas")
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["companies"][0]["name"] == "Despues"
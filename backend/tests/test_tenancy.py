@@ -0,0 +1,142 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+
+from app.core.security import create_access_token
+from app.main import app
+from app.models.db import Company, Document, Expiration, Worker
+from app.services.expiration_service import verify_expirations
+
+
+async def _seed(db_session, name: str) -> tuple[int, int, int]:
+    company = Company(name=name, tax_id=f"T-{name}")
+    db_session.add(company)
+    await db_session.flush()
+    worker = Worker(company_id=company.id, first_name=name, last_name="W", email=f"{name}@example.com")
+    db_session.add(worker)
+    await db_session.flush()
+    document = Document(
+        company_id=company.id,
+        worker_id=worker.id,
+        title=f"Doc {name}",
+        file_key=f"{name}.pdf",
+        expires_at=datetime.now(timezone.utc) + timedelta(days=3),
+    )
+    db_session.add(document)
+    await db_session.commit()
+    return company.id, worker.id, document.id
+
+
+def _supervisor(company_id: int) -> AsyncClient:
+    token = create_access_token("sup@example.com", {"role": "supervisor", "company_id": company_id})
+    return AsyncClient(
+        app=app, base_url="http://testserver", headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_supervisor_only_sees_own_company(client, db_session):
+    own_company, own_worker, own_document = await _seed(db_session, "propia")
+    other_company, other_worker, other_document = await _seed(db_session, "ajena")
+    await verify_expirations(db_session, full=True)
+
+    # Warm the cache as admin first; supervisors must not be served it.
+    assert len((await client.get("/companies/")).json()) == 2
+    assert (await client.get(f"/companies/{other_company}")).status_code == 200
+
+    async with _supervisor(own_company) as supervisor:
+        companies = (await supervisor.get("/companies/")).json()
+        workers = (await supervisor.get("/workers/")).json()
+        documents = (await supervisor.get("/documentos/")).json()
+        expirations = (await supervisor.get("/expirations/")).json()
+        other = await supervisor.get(f"/companies/{other_company}")
+        other_worker_response = await supervisor.get(f"/workers/{other_worker}")
+        export = await supervisor.get("/exports/documents")
+        statistics = (await supervisor.get("/estadisticas")).json()
+
+    assert [company["id"] for company in companies] == [own_company]
+    assert [worker["id"] for worker in workers] == [own_worker]
+    assert [document["id"] for document in documents] == [own_document]
+    assert [expiration["document_id"] for expiration in expirations] == [own_document]
+    assert other.status_code == 404
+    assert other_worker_response.status_code == 404
+    rows = [json.loads(line) for line in export.text.splitlines()]
+    assert [row["document_id"] for row in rows] == [own_document]
+    assert [company["company_id"] for company in statistics["companies"]] == [own_company]
+
+    # The admin view is unaffected by the supervisor's requests.
+    assert len((await client.get("/companies/")).json()) == 2
+    assert len((await client.get("/estadisticas")).json()["companies"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_supervisor_cannot_write_to_other_company(db_session, storage):
+    own_company, _, _ = await _seed(db_session, "propia")
+    other_company, other_worker, _ = await _seed(db_session, "ajena")
+
+    async with _supervisor(own_company) as supervisor:
+        created = await supervisor.post(
+            "/workers/",
+            json={"company_id": other_company, "first_name": "X", "last_name": "Y", "email": "x@example.com"},
+        )
+        deleted = await supervisor.delete(f"/workers/{other_worker}")
+        new_company = await supervisor.post("/companies/", json={"name": "Nueva", "tax_id": "N1"})
+        verify = await supervisor.post("/expirations/verify")
+        uploaded = await supervisor.post(
+            "/documentos/",
+            data={"company_id": str(own_company), "title": "X", "worker_id": str(other_worker)},
+            files={"file": ("x.pdf", b"%PDF-x", "application/pdf")},
+        )
+        completed = await supervisor.post(
+            "/documentos/complete",
+            json={
+                "company_id": own_company,
+                "worker_id": other_worker,
+                "title": "X",
+                "file_key": f"companies/{own_company}/x.pdf",
+            },
+        )
+
+    assert created.status_code == 404
+    assert uploaded.status_code == 404
+    assert completed.status_code == 404
+    assert deleted.status_code == 404
+    assert new_company.status_code == 403
+    assert verify.status_code == 403
+    assert await db_session.get(Worker, other_worker) is not None
+
+
+@pytest.mark.asyncio
+async def test_session_info_scopes_code_outside_requests(session_factory, db_session):
+    own_company, _, own_document = await _seed(db_session, "propia")
+    await _seed(db_session, "ajena")
+    await verify_expirations(db_session, full=True)
+
+    async with session_factory() as session:
+        session.info["company_id"] = own_company
+        documents = (await session.scalars(select(Document.id))).all()
+        expirations = (await session.scalars(select(Expiration.document_id))).all()
+
+    assert documents == [own_document]
+    assert expirations == [own_document]
+
+
+@pytest.mark.asyncio
+async def test_supervisor_without_company_is_rejected():
+    token = create_access_token("sup@example.com", {"role": "supervisor"})
+    async with AsyncClient(
+        app=app, base_url="http://testserver", headers={"Authorization": f"Bearer {token}"}
+    ) as supervisor:
+        assert (await supervisor.get("/companies/")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_scoped_listing_uses_composite_index(db_session):
+    plan = await db_session.execute(
+        text("EXPLAIN QUERY PLAN SELECT id FROM documents WHERE company_id = 1 AND id > 5 ORDER BY id")
+    )
+
+    assert "COVERING INDEX ix_documents_company_id_id" in " ".join(row[-1] for row in plan)
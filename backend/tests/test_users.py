@@ -0,0 +1,113 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.security import hash_password, needs_rehash, verify_password
+from app.main import app
+from app.services.user_service import authenticate, create_user, ensure_admin_user
+
+
+async def _login(email: str, password: str):
+    async with AsyncClient(app=app, base_url="http://testserver") as anonymous:
+        return await anonymous.post("/auth/login", json={"email": email, "password": password})
+
+
+def test_password_hash_round_trip_and_rehash(monkeypatch):
+    password_hash = hash_password("correcto-123")
+
+    assert password_hash.startswith(f"scrypt${settings.password_scrypt_n}$")
+    assert verify_password("correcto-123", password_hash)
+    assert not verify_password("incorrecto", password_hash)
+    assert not verify_password("correcto-123", "plaintext")
+    assert not needs_rehash(password_hash)
+
+    monkeypatch.setattr(settings, "password_scrypt_n", 2**15)
+    assert needs_rehash(password_hash)
+    assert verify_password("correcto-123", password_hash)
+
+
+@pytest.mark.asyncio
+async def test_admin_is_seeded_once(db_session):
+    admin = await ensure_admin_user(db_session)
+
+    assert admin.role == "admin"
+    assert admin.email == settings.admin_email.lower()
+    assert admin.password_hash != settings.admin_password
+    assert await ensure_admin_user(db_session) is None
+
+
+@pytest.mark.asyncio
+async def test_outdated_hash_is_upgraded_on_login(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "password_scrypt_n", 2**12)
+    user = await create_user(
+        db_session, email="Ana@Example.com", password="clave-segura", full_name="Ana", role="admin"
+    )
+    monkeypatch.setattr(settings, "password_scrypt_n", 2**13)
+
+    assert await authenticate(db_session, "ana@example.com", "clave-segura") is not None
+    await db_session.refresh(user)
+    assert user.password_hash.startswith("scrypt$8192$")
+    assert await authenticate(db_session, "ana@example.com", "otra") is None
+    assert await authenticate(db_session, "nadie@example.com", "clave-segura") is None
+
+
+@pytest.mark.asyncio
+async def test_supervisor_login_carries_role_and_company(client):
+    company = await client.post("/companies/", json={"name": "Sup", "tax_id": "SU1"})
+    company_id = company.json()["id"]
+    created = await client.post(
+        "/users/",
+        json={
+            "email": "sup@example.com",
+            "full_name": "Supervisor",
+            "password": "clave-segura",
+            "company_id": company_id,
+        },
+    )
+    assert created.status_code == 201
+    assert created.json()["role"] == "supervisor"
+    assert "password_hash" not in created.json()
+
+    login = await _login("sup@example.com", "clave-segura")
+    token = login.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(app=app, base_url="http://testserver", headers=headers) as supervisor:
+        assert (await supervisor.get("/companies/")).status_code == 200
+        assert (await supervisor.get("/users/")).status_code == 403
+
+    duplicate = await client.post(
+        "/users/",
+        json={"email": "SUP@example.com", "full_name": "Otro", "password": "clave-segura", "company_id": company_id},
+    )
+    assert duplicate.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_supervisor_requires_company(client):
+    response = await client.post(
+        "/users/",
+        json={"email": "sin@example.com", "full_name": "Sin", "password": "clave-segura"},
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_cannot_log_in(client, db_session):
+    user = await create_user(
+        db_session, email="baja@example.com", password="clave-segura", full_name="Baja", role="admin"
+    )
+
+    assert (await client.delete(f"/users/{user.id}")).status_code == 204
+    assert (await _login("baja@example.com", "clave-segura")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited(login_rate_limiter):
+    for _ in range(login_rate_limiter.attempts):
+        assert (await _login("intruso@example.com", "adivinanza")).status_code == 401
+
+    response = await _login("intruso@example.com", "adivinanza")
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1